@@ -1,6 +1,369 @@
 # AI_uno.py
 # main AI file
+import atexit
+import copy
 import random
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np  # optional: only needed for batched leaf evaluation
+except ImportError:
+    np = None
+
+from ismcts_uno import ismcts_search
+from uno_core import (CARD_COLORS, WILD_TEXTS, KIND_CARDS, NUM_KINDS, TOP_CARDS, PLAYABLE_MASK,
+                      DECK_KIND_COUNTS, kind_id, top_id, hand_counts, hand_mask, mask_kinds,
+                      deck_cards, valid_cards, card_effect)
+
+# -----------------------CARD ENCODING-----------------------#
+# Card kind and top-of-pile ids come from uno_core; the tables below add what
+# the search and evaluation need per kind.
+# color slot: 0-3 follow CARD_COLORS, 4 counts wilds (same as _count_colors)
+KIND_COLOR_SLOT = [4 if t in WILD_TEXTS else CARD_COLORS.index(c) for c, t in KIND_CARDS]
+KIND_SPECIAL = [2 if t in WILD_TEXTS else 1 if t in ['skip', 'reverse', 'draw two'] else 0
+                for c, t in KIND_CARDS]
+
+
+def _static_priority(card, top):
+    """Static move priority used by AI_bot._order_moves."""
+    color, text = card
+    if text == 'wild draw four':
+        return 900
+    elif text == 'wild':
+        return 800
+    elif text == 'draw two':
+        return 700
+    elif text in ['skip', 'reverse']:
+        return 600
+    elif color == top[0]:
+        return 500
+    return 400
+
+
+# legal kinds per top id (from uno_core.PLAYABLE_MASK), best static priority first
+PLAYABLE_KINDS = [tuple(sorted(mask_kinds(PLAYABLE_MASK[t]),
+                               key=lambda k: _static_priority(KIND_CARDS[k], top), reverse=True))
+                  for t, top in enumerate(TOP_CARDS)]
+
+
+# -----------------------ZOBRIST HASHING-----------------------#
+# Random 64-bit keys for (hand, kind, count), the top card, the side to move
+# and the remaining depth. A position key is the XOR of its parts, so playing
+# a card only changes two hand entries and the top entry.
+MAX_KIND_COPIES = 4  # wilds and wild draw fours appear four times in a deck
+_zobrist_rng = random.Random(0x5EED)
+ZOBRIST_AI = [[0] + [_zobrist_rng.getrandbits(64) for _ in range(MAX_KIND_COPIES)]
+              for _ in range(NUM_KINDS)]
+ZOBRIST_OPP = [[0] + [_zobrist_rng.getrandbits(64) for _ in range(MAX_KIND_COPIES)]
+               for _ in range(NUM_KINDS)]
+ZOBRIST_TOP = [_zobrist_rng.getrandbits(64) for _ in range(len(TOP_CARDS))]
+ZOBRIST_MAX_TO_MOVE = _zobrist_rng.getrandbits(64)
+ZOBRIST_DEPTH = [_zobrist_rng.getrandbits(64) for _ in range(64)]
+
+
+def zobrist_key(ai_counts, opp_counts, top):
+    """Return the position key of two count vectors and a top id."""
+    key = ZOBRIST_TOP[top]
+    for k in range(NUM_KINDS):
+        key ^= ZOBRIST_AI[k][ai_counts[k]] ^ ZOBRIST_OPP[k][opp_counts[k]]
+    return key
+
+# -----------------------COLOR SYMMETRY-----------------------#
+# Optional keys that ignore which color is which (AI_bot color_symmetry=True).
+# Every card has a rank (its text: 13 colored ranks, then the wilds) and a
+# slot (its color, or NEUTRAL_SLOT for wilds and an uncolored top). Random
+# keys for (hand, rank, count) and the top card's rank are XORed into the
+# slot they belong to, so a slot key describes its color's content without
+# naming the color. The canonical key is the neutral slot plus the four color
+# slots in sorted order, shared by all 24 recolorings of a position; the same
+# sort gives the color order that maps moves in and out of that coloring.
+NEUTRAL_SLOT = 4
+RANK_TEXTS = [t for c, t in KIND_CARDS if c == CARD_COLORS[0]] + list(WILD_TEXTS)
+KIND_RANK = [RANK_TEXTS.index(t) for c, t in KIND_CARDS]
+TOP_SLOT = [CARD_COLORS.index(c) if c in CARD_COLORS else NEUTRAL_SLOT for c, t in TOP_CARDS]
+TOP_RANK = [RANK_TEXTS.index(t) for c, t in TOP_CARDS]
+# kind id of (color slot, rank) for the colored ranks
+COLOR_RANK_KIND = [[KIND_CARDS.index((c, t)) for t in RANK_TEXTS[:-len(WILD_TEXTS)]] for c in CARD_COLORS]
+
+_SLOT_AI_RANK = [[0] + [_zobrist_rng.getrandbits(64) for _ in range(MAX_KIND_COPIES)]
+                 for _ in range(len(RANK_TEXTS))]
+_SLOT_OPP_RANK = [[0] + [_zobrist_rng.getrandbits(64) for _ in range(MAX_KIND_COPIES)]
+                  for _ in range(len(RANK_TEXTS))]
+_SLOT_TOP_RANK = [_zobrist_rng.getrandbits(64) for _ in range(len(RANK_TEXTS))]
+# per kind / top id views of the rank tables (kinds of one rank share their keys)
+SLOT_ZOBRIST_AI = [_SLOT_AI_RANK[rank] for rank in KIND_RANK]
+SLOT_ZOBRIST_OPP = [_SLOT_OPP_RANK[rank] for rank in KIND_RANK]
+SLOT_ZOBRIST_TOP = [_SLOT_TOP_RANK[rank] for rank in TOP_RANK]
+
+
+def zobrist_slot_keys(ai_counts, opp_counts, top):
+    """Return the five slot keys (four colors, then neutral) of two count vectors and a top id."""
+    keys = [0] * (NEUTRAL_SLOT + 1)
+    keys[TOP_SLOT[top]] ^= SLOT_ZOBRIST_TOP[top]
+    for k in range(NUM_KINDS):
+        keys[KIND_COLOR_SLOT[k]] ^= SLOT_ZOBRIST_AI[k][ai_counts[k]] ^ SLOT_ZOBRIST_OPP[k][opp_counts[k]]
+    return keys
+
+
+def canonical_key(slot_keys):
+    """Position key of slot keys, the same for every color permutation."""
+    return hash((slot_keys[NEUTRAL_SLOT], *sorted(slot_keys[:NEUTRAL_SLOT])))
+
+
+def canonical_move(kind, order):
+    """Kind id of a move in the canonical coloring given by a color order (see CompactState.canonical)."""
+    slot = KIND_COLOR_SLOT[kind]
+    if slot == NEUTRAL_SLOT:
+        return kind
+    return COLOR_RANK_KIND[order.index(slot)][KIND_RANK[kind]]
+
+
+def actual_move(kind, order):
+    """Inverse of canonical_move: the kind id of a canonical move in the position's own colors."""
+    slot = KIND_COLOR_SLOT[kind]
+    if slot == NEUTRAL_SLOT:
+        return kind
+    return COLOR_RANK_KIND[order[slot]][KIND_RANK[kind]]
+
+# -----------------------TRANSPOSITION TABLE-----------------------#
+TT_EXACT, TT_LOWER, TT_UPPER = 0, 1, 2
+
+
+class TranspositionTable:
+    """
+    Bounded cache of _minimax results keyed by Zobrist key.
+    Entries are (value, flag, best_move) where flag says whether value is
+    exact or only a lower/upper bound; the least recently used entry is
+    evicted once max_entries is reached.
+    """
+    ENTRY_BYTES = 240  # rough size of one OrderedDict slot + entry tuple + ints
+
+    def __init__(self, max_entries):
+        self.max_entries = max(1, max_entries)
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_memory_mb(cls, memory_mb):
+        """Create a table sized to roughly memory_mb megabytes."""
+        return cls(int(memory_mb * 1024 * 1024 / cls.ENTRY_BYTES))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def probe(self, key):
+        """Return the entry stored for key (refreshing it) or None."""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry
+
+    def store(self, key, value, flag, best_move):
+        """Store an entry, evicting the least recently used one if full."""
+        entries = self.entries
+        if key in entries:
+            entries.move_to_end(key)
+        elif len(entries) >= self.max_entries:
+            entries.popitem(last=False)
+        entries[key] = (value, flag, best_move)
+
+    def clear(self):
+        """Drop all entries and reset hit/miss counters."""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+# -----------------------EVALUATION CACHE-----------------------#
+EVAL_CACHE_EVICTION = ('lru', 'fifo')
+
+
+class EvalCache:
+    """
+    Bounded cache of static leaf scores keyed by the position's Zobrist key,
+    which encodes both hands as kind counts (order-independent) plus the top
+    card; with color_symmetry=True the key is canonical up to color
+    permutation. Unlike the transposition table it holds no search bounds, so
+    entries stay valid across samples and moves until the evaluation weights
+    change.
+    eviction 'lru' drops the least recently used entry when full, 'fifo' the
+    oldest (cheaper: hits do not reorder).
+    """
+    def __init__(self, max_entries, eviction='lru'):
+        if eviction not in EVAL_CACHE_EVICTION:
+            raise ValueError(f"eviction must be one of {EVAL_CACHE_EVICTION}")
+        self.max_entries = max(1, max_entries)
+        self.eviction = eviction
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """Return the score stored for key or None."""
+        score = self.entries.get(key)
+        if score is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.eviction == 'lru':
+            self.entries.move_to_end(key)
+        return score
+
+    def put(self, key, score):
+        """Store a score, evicting one entry if full."""
+        entries = self.entries
+        if len(entries) >= self.max_entries and key not in entries:
+            entries.popitem(last=False)
+        entries[key] = score
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        """Drop all entries and reset hit/miss counters."""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+# -----------------------EVALUATION WEIGHTS-----------------------#
+# Terms of AI_bot._evaluate_state and their default weights. An AI_bot takes a
+# profile overriding any of them (eval_weights=, e.g. from eval_tuner.py).
+EVAL_FEATURES = ('hand_size', 'special', 'color', 'playability', 'winning')
+DEFAULT_EVAL_WEIGHTS = {'hand_size': 100, 'special': 50, 'color': 30, 'playability': 20, 'winning': 150}
+
+
+def eval_weight_tuple(profile):
+    """Weights of a profile dict in EVAL_FEATURES order (missing terms use the defaults)."""
+    unknown = set(profile) - set(EVAL_FEATURES)
+    if unknown:
+        raise ValueError(f"unknown evaluation terms: {sorted(unknown)}")
+    return tuple(profile.get(name, DEFAULT_EVAL_WEIGHTS[name]) for name in EVAL_FEATURES)
+
+# -----------------------BATCHED EVALUATION-----------------------#
+# NumPy version of AI_bot._evaluate_state over many leaves at once. Hands are
+# rows of a (batch, NUM_KINDS) count matrix; the arithmetic is done in the same
+# order as the scalar helpers, so both paths return bit-identical scores.
+if np is not None:
+    SPECIAL_VECTOR = np.array(KIND_SPECIAL, dtype=np.float64)
+    COLOR_SLOT_MATRIX = np.zeros((NUM_KINDS, 5), dtype=np.int64)
+    COLOR_SLOT_MATRIX[np.arange(NUM_KINDS), KIND_COLOR_SLOT] = 1
+    PLAYABLE_MATRIX = np.zeros((len(TOP_CARDS), NUM_KINDS), dtype=np.int64)
+    for _top, _kinds in enumerate(PLAYABLE_KINDS):
+        PLAYABLE_MATRIX[_top, list(_kinds)] = 1
+
+
+def evaluation_features(ai_counts, opp_counts, tops):
+    """
+    The _evaluate_state terms of a batch of states, one EVAL_FEATURES column each.
+    ai_counts, opp_counts: (batch, NUM_KINDS) integer count matrices
+    tops: (batch,) top ids
+    Returns a (batch, len(EVAL_FEATURES)) float64 array.
+    """
+    ai_size = ai_counts.sum(axis=1)
+    opp_size = opp_counts.sum(axis=1)
+    ai_div = np.maximum(ai_size, 1)
+    opp_div = np.maximum(opp_size, 1)
+
+    special = ai_counts @ SPECIAL_VECTOR - opp_counts @ SPECIAL_VECTOR
+    color = ((ai_counts @ COLOR_SLOT_MATRIX).max(axis=1) / ai_div -
+             (opp_counts @ COLOR_SLOT_MATRIX).max(axis=1) / opp_div)
+    playable = PLAYABLE_MATRIX[tops]
+    playability = ((ai_counts * playable).sum(axis=1) / ai_div -
+                   (opp_counts * playable).sum(axis=1) / opp_div)
+    bonus = np.where(ai_size <= 2, 2.0, np.where(ai_size <= 4, 1.0, 0.0))
+    penalty = np.where(opp_size <= 2, -2.0, np.where(opp_size <= 4, -1.0, 0.0))
+    return np.stack([opp_size - ai_size, special, color, playability, bonus + penalty], axis=1).astype(np.float64)
+
+
+def evaluate_batch(ai_counts, opp_counts, tops, weights=None):
+    """
+    Score a batch of leaf states in one call (arguments as evaluation_features;
+    weights: EVAL_FEATURES weight tuple, default DEFAULT_EVAL_WEIGHTS).
+    Returns a float64 array of _evaluate_state scores.
+    """
+    if weights is None:
+        weights = eval_weight_tuple(DEFAULT_EVAL_WEIGHTS)
+    features = evaluation_features(ai_counts, opp_counts, tops)
+    score = np.zeros(len(tops), dtype=np.float64)
+    for column, weight in enumerate(weights):
+        score += features[:, column] * weight
+    score[opp_counts.sum(axis=1) == 0] = -1000  # Opponent won
+    score[ai_counts.sum(axis=1) == 0] = 1000  # AI won
+    return score
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the per-move time or node budget is spent."""
+
+
+class SearchCancelled(Exception):
+    """Raised out of choose_card when AI_bot.cancel_event is set mid-search."""
+
+# -----------------------SEARCH STATISTICS-----------------------#
+class SearchStats:
+    """
+    Counters of one minimax_card search (AI_bot collect_stats=True).
+    Per-depth dicts are keyed by remaining search depth (0 = leaf).
+    Root searches run on the process pool only add to nodes.
+    """
+    def __init__(self, valid_moves=0):
+        self.valid_moves = valid_moves   # root cards searched
+        self.nodes = 0                   # total nodes (same as AI_bot.nodes_searched)
+        self.endgame_nodes = 0           # endgame solver nodes (in nodes, not in the per-depth dicts)
+        self.expanded = 0                # nodes whose moves were generated
+        self.cutoffs = 0                 # beta <= alpha breaks
+        self.first_move_cutoffs = 0      # cutoffs caused by the first ordered move
+        self.tt_hits = 0
+        self.tt_misses = 0
+        self.eval_cache_hits = 0
+        self.eval_cache_misses = 0
+        self.nodes_by_depth = {}
+        self.cutoffs_by_depth = {}
+        self.cutoff_move_index = {}      # position of the cutting move -> count
+        self.sample_times = []           # seconds per sampled opponent hand
+        self.iteration_times = {}        # depth -> seconds of each completed pass (one for fixed depth)
+        self.completed_depth = 0
+        self.elapsed = 0.0
+
+    def count_cutoff(self, depth, move_index):
+        """Record a beta <= alpha cutoff by the move_index-th ordered move."""
+        self.cutoffs += 1
+        self.cutoffs_by_depth[depth] = self.cutoffs_by_depth.get(depth, 0) + 1
+        self.cutoff_move_index[move_index] = self.cutoff_move_index.get(move_index, 0) + 1
+        if move_index == 0:
+            self.first_move_cutoffs += 1
+
+    @property
+    def prune_rate(self):
+        """Share of expanded nodes that ended in a cutoff."""
+        return self.cutoffs / self.expanded if self.expanded else 0.0
+
+    @property
+    def ordering_effectiveness(self):
+        """Share of cutoffs found by the first move tried (1.0 = perfect ordering)."""
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    @property
+    def nodes_per_sec(self):
+        return self.nodes / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self):
+        """Plain dict of every counter and derived rate, e.g. for logging as JSON."""
+        data = dict(vars(self))
+        data['prune_rate'] = self.prune_rate
+        data['ordering_effectiveness'] = self.ordering_effectiveness
+        data['nodes_per_sec'] = self.nodes_per_sec
+        return data
 
 # -----------------------GAME STATE-----------------------#
 class GameState:
@@ -65,22 +428,499 @@ class GameState:
 
     def get_valid_moves(self, is_ai):
         """
-        Return a list of cards that can be legally played for the current player.
+        Return the cards that can be legally played for the current player, one
+        card per kind (identical cards lead to identical subtrees).
         """
-        hand = self.ai_hand if is_ai else self.opponent_hand
-        valid = []
-        for card in hand:
-            if (card.color == self.current_card.color or
-                card.text == self.current_card.text or
-                    card.text in ['wild', 'wild draw four']):
-                valid.append(card)
-        return valid
+        moves = {}
+        for card in valid_cards(self.ai_hand if is_ai else self.opponent_hand, self.current_card):
+            moves.setdefault(kind_id(card), card)
+        return list(moves.values())
+
+    # evaluation interface shared with CompactState
+    def hand_size(self, is_ai):
+        """Number of cards in a player's hand."""
+        return len(self.ai_hand if is_ai else self.opponent_hand)
+
+    def special_count(self, is_ai):
+        """Action cards count 1, wilds count 2."""
+        special = 0
+        for card in (self.ai_hand if is_ai else self.opponent_hand):
+            if card.text in ['skip', 'reverse', 'draw two']:
+                special += 1
+            elif card.text in ['wild', 'wild draw four']:
+                special += 2
+        return special
+
+    def max_color_count(self, is_ai):
+        """Largest per-color count in a player's hand (wilds form their own color)."""
+        return max((self.ai_color_count if is_ai else self.opp_color_count).values())
+
+    def playable_count(self, is_ai):
+        """Number of cards a player could legally play on the current card (copies count)."""
+        return len(valid_cards(self.ai_hand if is_ai else self.opponent_hand, self.current_card))
+
+
+class CompactState:
+    """
+    Count-vector snapshot of the game used by the search engine.
+    Hands are lists of NUM_KINDS counts indexed by kind id, the current card is
+    a top id, and moves are kind ids, so no card objects are touched in search.
+    """
+    __slots__ = ('ai_counts', 'opp_counts', 'top', 'deck_size', 'current_player',
+                 'ai_size', 'opp_size', 'ai_special', 'opp_special',
+                 'ai_color_count', 'opp_color_count', 'ai_mask', 'opp_mask', 'key', 'slot_keys')
+
+    def __init__(self, ai_counts, opp_counts, top, deck_size, current_player, canonical=False):
+        """
+        Initialize compact state.
+        ai_counts: count vector of AI's hand
+        opp_counts: count vector of opponent's hand
+        top: top id of the current card on discard pile
+        deck_size: Number of cards remaining in deck
+        current_player: 'ai' or 'opponent'
+        canonical: also keep color-symmetric slot keys (see canonical())
+        """
+        self.ai_counts = ai_counts
+        self.opp_counts = opp_counts
+        self.top = top
+        self.deck_size = deck_size
+        self.current_player = current_player
+
+        # Cached per-hand summaries, carried over incrementally by apply_move
+        self.ai_size = sum(ai_counts)
+        self.opp_size = sum(opp_counts)
+        self.ai_special = self._count_special(ai_counts)
+        self.opp_special = self._count_special(opp_counts)
+        self.ai_color_count = self._count_colors(ai_counts)
+        self.opp_color_count = self._count_colors(opp_counts)
+        self.ai_mask = hand_mask(ai_counts)
+        self.opp_mask = hand_mask(opp_counts)
+        self.key = zobrist_key(ai_counts, opp_counts, top)
+        self.slot_keys = zobrist_slot_keys(ai_counts, opp_counts, top) if canonical else None
+
+    @classmethod
+    def from_hands(cls, ai_hand, opponent_hand, current_card, deck_size, current_player):
+        """Build a compact state from card objects."""
+        return cls(hand_counts(ai_hand), hand_counts(opponent_hand),
+                   top_id(current_card), deck_size, current_player)
+
+    @classmethod
+    def from_game_state(cls, state):
+        """Convert a GameState into its compact form."""
+        return cls.from_hands(state.ai_hand, state.opponent_hand, state.current_card,
+                              state.deck_size, state.current_player)
+
+    def _count_special(self, counts):
+        """Sum of special-card weights in a count vector."""
+        return sum(n * KIND_SPECIAL[k] for k, n in enumerate(counts) if n)
+
+    def _count_colors(self, counts):
+        """Per-color counts [red, yellow, green, blue, wild] of a count vector."""
+        colors = [0, 0, 0, 0, 0]
+        for k, n in enumerate(counts):
+            if n:
+                colors[KIND_COLOR_SLOT[k]] += n
+        return colors
+
+    def pack(self):
+        """
+        Encode the state as 111 bytes (both count vectors, top id, player and
+        deck size) for sending to search worker processes.
+        """
+        return (bytes(self.ai_counts) + bytes(self.opp_counts) +
+                bytes((self.top, self.current_player == 'ai', min(self.deck_size, 255))))
+
+    @classmethod
+    def unpack(cls, data, canonical=False):
+        """Rebuild a state encoded by pack()."""
+        return cls(list(data[:NUM_KINDS]), list(data[NUM_KINDS:2 * NUM_KINDS]), data[-3],
+                   data[-1], 'ai' if data[-2] else 'opponent', canonical)
+
+    def is_terminal(self):
+        """Check if the game has ended (any player has no cards)."""
+        return self.ai_size == 0 or self.opp_size == 0
+
+    def copy(self):
+        """Return an independent copy (hands are not shared)."""
+        child = CompactState.__new__(CompactState)
+        child.ai_counts, child.opp_counts = self.ai_counts.copy(), self.opp_counts.copy()
+        child.ai_color_count, child.opp_color_count = self.ai_color_count.copy(), self.opp_color_count.copy()
+        child.top, child.deck_size, child.current_player = self.top, self.deck_size, self.current_player
+        child.ai_size, child.opp_size = self.ai_size, self.opp_size
+        child.ai_special, child.opp_special = self.ai_special, self.opp_special
+        child.ai_mask, child.opp_mask = self.ai_mask, self.opp_mask
+        child.key = self.key
+        child.slot_keys = None if self.slot_keys is None else self.slot_keys.copy()
+        return child
+
+    def canonical(self):
+        """
+        Return (canonical key, color order) of a state built with canonical=True.
+        The key is shared by every recoloring of the position; order[i] is the
+        color that plays color i of the canonical coloring (for canonical_move
+        and actual_move).
+        """
+        keys = self.slot_keys
+        order = sorted(range(NEUTRAL_SLOT), key=keys.__getitem__)
+        return hash((keys[NEUTRAL_SLOT], keys[order[0]], keys[order[1]], keys[order[2]], keys[order[3]])), order
+
+    def cache_key(self):
+        """Key for caches of static results: canonical when slot keys are kept, else key."""
+        return self.key if self.slot_keys is None else canonical_key(self.slot_keys)
+
+    def apply_move(self, kind, is_ai):
+        """
+        Generate a new compact state after a player plays a card kind.
+        The parent is left untouched; search code uses do_move/undo_move instead.
+        """
+        child = self.copy()
+        child.do_move(kind, is_ai)
+        return child
+
+    def do_move(self, kind, is_ai):
+        """
+        Play a card kind in place, updating hands, top card, cached counts and
+        key in O(1). Returns the previous top id, which undo_move needs.
+        """
+        prev_top = self.top
+        self.key ^= ZOBRIST_TOP[prev_top] ^ ZOBRIST_TOP[kind]
+        self.top = kind
+        if is_ai:
+            n = self.ai_counts[kind]
+            self.ai_counts[kind] = n - 1
+            if n == 1:
+                self.ai_mask ^= 1 << kind
+            self.key ^= ZOBRIST_AI[kind][n] ^ ZOBRIST_AI[kind][n - 1]
+            self.ai_color_count[KIND_COLOR_SLOT[kind]] -= 1
+            self.ai_size -= 1
+            self.ai_special -= KIND_SPECIAL[kind]
+            self.current_player = 'opponent'
+        else:
+            n = self.opp_counts[kind]
+            self.opp_counts[kind] = n - 1
+            if n == 1:
+                self.opp_mask ^= 1 << kind
+            self.key ^= ZOBRIST_OPP[kind][n] ^ ZOBRIST_OPP[kind][n - 1]
+            self.opp_color_count[KIND_COLOR_SLOT[kind]] -= 1
+            self.opp_size -= 1
+            self.opp_special -= KIND_SPECIAL[kind]
+            self.current_player = 'ai'
+        keys = self.slot_keys
+        if keys is not None:
+            slot_table = SLOT_ZOBRIST_AI if is_ai else SLOT_ZOBRIST_OPP
+            keys[TOP_SLOT[prev_top]] ^= SLOT_ZOBRIST_TOP[prev_top]
+            keys[TOP_SLOT[kind]] ^= SLOT_ZOBRIST_TOP[kind]
+            keys[KIND_COLOR_SLOT[kind]] ^= slot_table[kind][n] ^ slot_table[kind][n - 1]
+        return prev_top
+
+    def undo_move(self, kind, is_ai, prev_top):
+        """Take back a do_move of the same kind and player."""
+        self.key ^= ZOBRIST_TOP[kind] ^ ZOBRIST_TOP[prev_top]
+        self.top = prev_top
+        if is_ai:
+            n = self.ai_counts[kind]
+            self.ai_counts[kind] = n + 1
+            if n == 0:
+                self.ai_mask ^= 1 << kind
+            self.key ^= ZOBRIST_AI[kind][n] ^ ZOBRIST_AI[kind][n + 1]
+            self.ai_color_count[KIND_COLOR_SLOT[kind]] += 1
+            self.ai_size += 1
+            self.ai_special += KIND_SPECIAL[kind]
+            self.current_player = 'ai'
+        else:
+            n = self.opp_counts[kind]
+            self.opp_counts[kind] = n + 1
+            if n == 0:
+                self.opp_mask ^= 1 << kind
+            self.key ^= ZOBRIST_OPP[kind][n] ^ ZOBRIST_OPP[kind][n + 1]
+            self.opp_color_count[KIND_COLOR_SLOT[kind]] += 1
+            self.opp_size += 1
+            self.opp_special += KIND_SPECIAL[kind]
+            self.current_player = 'opponent'
+        keys = self.slot_keys
+        if keys is not None:
+            slot_table = SLOT_ZOBRIST_AI if is_ai else SLOT_ZOBRIST_OPP
+            keys[TOP_SLOT[kind]] ^= SLOT_ZOBRIST_TOP[kind]
+            keys[TOP_SLOT[prev_top]] ^= SLOT_ZOBRIST_TOP[prev_top]
+            keys[KIND_COLOR_SLOT[kind]] ^= slot_table[kind][n] ^ slot_table[kind][n + 1]
+
+    def get_valid_moves(self, is_ai):
+        """
+        Return the distinct card kinds the current player can legally play,
+        already in static priority order.
+        """
+        legal = (self.ai_mask if is_ai else self.opp_mask) & PLAYABLE_MASK[self.top]
+        if not legal:
+            return []
+        return [k for k in PLAYABLE_KINDS[self.top] if legal >> k & 1]
+
+    # evaluation interface shared with GameState
+    def hand_size(self, is_ai):
+        """Number of cards in a player's hand."""
+        return self.ai_size if is_ai else self.opp_size
+
+    def special_count(self, is_ai):
+        """Action cards count 1, wilds count 2."""
+        return self.ai_special if is_ai else self.opp_special
+
+    def max_color_count(self, is_ai):
+        """Largest per-color count in a player's hand (wilds form their own color)."""
+        return max(self.ai_color_count if is_ai else self.opp_color_count)
+
+    def playable_count(self, is_ai):
+        """Number of cards a player could legally play on the current card."""
+        counts = self.ai_counts if is_ai else self.opp_counts
+        legal = (self.ai_mask if is_ai else self.opp_mask) & PLAYABLE_MASK[self.top]
+        total = 0
+        while legal:
+            low = legal & -legal
+            total += counts[low.bit_length() - 1]
+            legal ^= low
+        return total
+
+# -----------------------OPPONENT BELIEF-----------------------#
+class OpponentBelief:
+    """
+    Particle filter over the opponent's hand, kept across turns: weighted
+    candidate hands as lists of kind ids. An observed play or pass zeroes the
+    weight of every hand that could not have made it, draws add unseen cards,
+    and the particles are resampled only once the effective sample size
+    falls below RESAMPLE_THRESHOLD of their number.
+    """
+    RESAMPLE_THRESHOLD = 0.5
+    DRAW_TRIES = 32  # rejection tries per drawn card before giving up on it
+
+    def __init__(self, num_particles, unknown_counts, hand_size, rng):
+        self.num_particles = num_particles
+        self.rng = rng
+        self.hand_size = hand_size
+        self.resamples = 0
+        self.observations = 0  # plays, passes and draws folded in so far
+        self.reset(unknown_counts)
+
+    def reset(self, unknown_counts, exclude=0):
+        """Fresh uniform particles from the card-count tracker, holding no kind in the exclude mask."""
+        pool = _unknown_list(unknown_counts, exclude)
+        if len(pool) < self.hand_size:
+            pool = _unknown_list(unknown_counts)
+        size = min(self.hand_size, len(pool))
+        self.particles = [self.rng.sample(pool, size) for _ in range(self.num_particles)]
+        self.weights = [1.0] * self.num_particles
+
+    def effective_size(self):
+        """Effective sample size of the weights (num_particles when uniform, 0 when all are dead)."""
+        total = sum(self.weights)
+        return total * total / sum(w * w for w in self.weights) if total else 0.0
+
+    def copy(self):
+        """Independent copy of the particles and weights (sharing the rng), for what-if observations."""
+        other = copy.copy(self)
+        other.particles = [list(hand) for hand in self.particles]
+        other.weights = list(self.weights)
+        return other
+
+    # -----------------------OBSERVATIONS-----------------------#
+    def observe_play(self, kind, unknown_counts):
+        """The opponent played a card of kind: hands without one are impossible."""
+        self.observations += 1
+        for i, hand in enumerate(self.particles):
+            if kind in hand:
+                hand.remove(kind)
+            else:
+                self.weights[i] = 0.0
+        self.hand_size = max(self.hand_size - 1, 0)
+        self._maybe_resample(unknown_counts)
+
+    def observe_pass(self, top, unknown_counts):
+        """The opponent holds nothing playable on top id: hands that do are impossible."""
+        self.observations += 1
+        playable = PLAYABLE_MASK[top]
+        for i, hand in enumerate(self.particles):
+            if self.weights[i] and any(playable >> kind & 1 for kind in hand):
+                self.weights[i] = 0.0
+        self._maybe_resample(unknown_counts, playable)
+
+    def observe_draw(self, count, unknown_counts):
+        """The opponent drew count unseen cards: each hand draws from what it leaves unknown."""
+        self.observations += 1
+        pool = _unknown_list(unknown_counts)
+        for hand in self.particles:
+            self._add_random(hand, unknown_counts, pool, count)
+        self.hand_size += count
+
+    # -----------------------SAMPLING-----------------------#
+    def sample(self, count, unknown_counts, hand_size):
+        """
+        count hands as kind-count lists, picked by weight (systematic, so
+        distinct particles when the weights allow) and repaired to match the
+        tracker and hand_size. The particles themselves are not changed.
+        """
+        pool = _unknown_list(unknown_counts)
+        hand_size = min(hand_size, len(pool))
+        samples = []
+        for i in self._systematic(count):
+            counts = [0] * NUM_KINDS
+            hand = []
+            for kind in self.particles[i]:
+                if counts[kind] < unknown_counts[kind]:  # drop copies the AI has since seen
+                    counts[kind] += 1
+                    hand.append(kind)
+            if len(hand) > hand_size:
+                for kind in self.rng.sample(hand, len(hand) - hand_size):
+                    counts[kind] -= 1
+            elif len(hand) < hand_size:
+                for kind in self._add_random(hand, unknown_counts, pool, hand_size - len(hand)):
+                    counts[kind] += 1
+            samples.append(counts)
+        return samples
+
+    def _systematic(self, count):
+        """count particle indices by systematic resampling of the weights."""
+        weights = self.weights
+        step = sum(weights) / count
+        target = self.rng.random() * step
+        picks = []
+        i, cumulative = 0, weights[0]
+        for _ in range(count):
+            while cumulative < target and i < len(weights) - 1:
+                i += 1
+                cumulative += weights[i]
+            picks.append(i)
+            target += step
+        return picks
+
+    def _maybe_resample(self, unknown_counts, exclude=0):
+        """Resample when the effective size collapses; start over if every particle died."""
+        if sum(self.weights) == 0:
+            self.reset(unknown_counts, exclude)
+            self.resamples += 1
+            return
+        if self.effective_size() >= self.RESAMPLE_THRESHOLD * self.num_particles:
+            return
+        pool = _unknown_list(unknown_counts, exclude)
+        particles = []
+        picked = set()
+        for i in self._systematic(self.num_particles):
+            hand = list(self.particles[i])
+            if i in picked and hand:
+                # move duplicates apart: swap one card for another unknown one
+                del hand[self.rng.randrange(len(hand))]
+                self._add_random(hand, unknown_counts, pool, 1)
+            picked.add(i)
+            particles.append(hand)
+        self.particles = particles
+        self.weights = [1.0] * self.num_particles
+        self.resamples += 1
+
+    def _add_random(self, hand, unknown_counts, pool, count):
+        """
+        Append up to count random cards to hand from the unknown cards it does
+        not already hold (pool: _unknown_list of the tracker). Returns the new kinds.
+        """
+        added = []
+        for _ in range(count):
+            for _ in range(self.DRAW_TRIES):
+                if not pool:
+                    return added
+                kind = self.rng.choice(pool)
+                # accept with the share of kind's unknown copies this hand leaves free
+                if self.rng.random() * unknown_counts[kind] < unknown_counts[kind] - hand.count(kind):
+                    hand.append(kind)
+                    added.append(kind)
+                    break
+        return added
+
+
+def _unknown_list(unknown_counts, exclude=0):
+    """Kind id of every unknown card, one entry per copy, leaving out kinds in the exclude mask."""
+    return [k for k, n in enumerate(unknown_counts) if not exclude >> k & 1 for _ in range(n)]
+
+# -----------------------PARALLEL SEARCH-----------------------#
+# One process pool is shared by every AI_bot with parallel_workers set and kept
+# alive across turns; each worker process keeps its own search bot and table.
+_search_pool = None
+_search_pool_workers = 0
+_worker_bot = None
+
+
+def get_search_pool(workers):
+    """Return the shared search pool, (re)creating it for the given worker count."""
+    global _search_pool, _search_pool_workers
+    if _search_pool is None or _search_pool_workers != workers:
+        shutdown_search_pool()
+        _search_pool = ProcessPoolExecutor(max_workers=workers)
+        _search_pool_workers = workers
+    return _search_pool
+
+
+def shutdown_search_pool():
+    """Stop the shared search pool if it is running."""
+    global _search_pool, _search_pool_workers
+    if _search_pool is not None:
+        _search_pool.shutdown(cancel_futures=True)
+        _search_pool = None
+        _search_pool_workers = 0
+
+
+atexit.register(shutdown_search_pool)
+
+
+def _search_root_job(job):
+    """
+    Worker entry point: search one (sample, root card) pair.
+    job is (packed state after the AI's move, depth, deepening, deadline as
+    time.time() or None, node limit or None, evaluation weight tuple,
+    color_symmetry).
+    Returns (score or None on timeout, nodes searched).
+    """
+    global _worker_bot
+    if _worker_bot is None:
+        _worker_bot = AI_bot('search worker', [], [], persist_tt=True)
+    packed, depth, deepening, deadline, node_limit, eval_weights, color_symmetry = job
+    bot = _worker_bot
+    if bot.eval_weights != eval_weights:
+        bot.set_eval_weights(dict(zip(EVAL_FEATURES, eval_weights)))
+    if deadline is not None:
+        deadline = time.perf_counter() + (deadline - time.time())
+    bot._arm_budget(deadline, node_limit)
+    bot._deepening = deepening
+    try:
+        state = CompactState.unpack(packed, color_symmetry)
+        score = bot._minimax(state, depth, float('-inf'), float('inf'), False)
+    except SearchTimeout:
+        score = None
+    finally:
+        bot._deepening = False
+    return score, bot.nodes_searched
 
 # -----------------------AI BOT-----------------------#
 class AI_bot:
     """Represents the AI player and decision-making logic."""
-    def __init__(self, name, deck, hand, difficulty='medium'):
+    def __init__(self, name, deck, hand, difficulty='medium', tt_memory_mb=16, persist_tt=False,
+                 time_budget=None, node_budget=None, parallel_workers=0, batch_leaf_eval=False,
+                 rng=None, strategy=None, mcts_playouts=None, collect_stats=False, stats_callback=None,
+                 eval_weights=None, eval_cache_size=0, eval_cache_eviction='lru', color_symmetry=False):
+        """
+        tt_memory_mb: memory cap of the transposition table (0 disables it)
+        persist_tt: keep table entries across turns instead of clearing per move
+        time_budget: seconds per move; with node_budget, enables iterative deepening
+        node_budget: searched nodes per move for iterative deepening
+        parallel_workers: spread root searches over this many processes (0 = in-process)
+        batch_leaf_eval: score each depth-1 frontier with evaluate_batch (needs numpy)
+        rng: random.Random used for sampling and random play (default: random module)
+        strategy: 'minimax' or 'ismcts', overriding STRATEGY_CONFIG for this bot
+        mcts_playouts: ISMCTS iterations per move, overriding MCTS_PLAYOUT_CONFIG
+        collect_stats: record a SearchStats per minimax_card call in last_stats
+        stats_callback: called with each SearchStats (implies collect_stats)
+        eval_weights: evaluation weight profile, {term: weight} over EVAL_FEATURES
+        eval_cache_size: leaf scores kept in the evaluation cache (default 0: off;
+            it hits about 9% of leaves, saving 4-6% of search time)
+        eval_cache_eviction: 'lru' or 'fifo' eviction of the evaluation cache
+        color_symmetry: key the transposition table, evaluation cache and endgame
+            memo up to color permutation (see COLOR SYMMETRY)
+        """
         self.name = name
+        self.rng = rng if rng is not None else random
         self.hand = hand
         self.is_AI_turn = False
         self.difficulty = difficulty
@@ -89,9 +929,95 @@ class AI_bot:
         self.opponent_hand_size = 7
         self.discard_history = []
 
+        # Card-count tracker: copies of each kind the AI has not seen yet (in the
+        # deck or the opponent's hand). Kept current by draws and record_discard.
+        self.unknown_counts = [total - held for total, held in zip(DECK_KIND_COUNTS, hand_counts(hand))]
+
+        # Evaluation weights (see set_eval_weights); eval_weights is the tuple used in search
+        self.EVAL_WEIGHTS = dict(DEFAULT_EVAL_WEIGHTS)
+        if eval_weights:
+            self.EVAL_WEIGHTS.update(eval_weights)
+        self.eval_weights = eval_weight_tuple(self.EVAL_WEIGHTS)
+
         # Difficulty settings for minimax depth and opponent sampling
+        # (belief samples are better than uniform ones, so medium and hard need fewer)
         self.DEPTH_CONFIG = {'easy': 2, 'medium': 4, 'hard': 6}
-        self.SAMPLE_CONFIG = {'easy': 2, 'medium': 4, 'hard': 6}
+        self.SAMPLE_CONFIG = {'easy': 2, 'medium': 3, 'hard': 4}
+
+        # Opponent hand belief: particles of the OpponentBelief filter that samples
+        # are drawn from (None = uniform samples from the card-count tracker)
+        self.BELIEF_CONFIG = {'easy': None, 'medium': 64, 'hard': 128}
+        self.belief = None  # created on first use, see _get_belief
+
+        # Endgame solving once both hands are at most (AI cards, opponent cards). The
+        # solver plays out the search's no-draw model (a stuck player passes), so its
+        # values approximate the real game; the limits keep it to the last few cards.
+        self.ENDGAME_CONFIG = {'easy': None, 'medium': (2, 2), 'hard': (3, 3)}
+        self.ENDGAME_MEMO_LIMIT = 500000  # memo entries kept across moves
+        self.ENDGAME_BUDGET_SHARE = 0.5  # of a time/node budget left, the most a solve may use
+        self.endgame_memo = {}
+
+        # Search strategy per difficulty and ISMCTS playouts (time_budget also caps ISMCTS)
+        self.STRATEGY_CONFIG = {'easy': 'minimax', 'medium': 'minimax', 'hard': 'minimax'}
+        self.MCTS_PLAYOUT_CONFIG = {'easy': 200, 'medium': 800, 'hard': 2000}
+        self.strategy = strategy
+        self.mcts_playouts = mcts_playouts
+
+        # Transposition table shared by every _minimax call of this bot
+        self.tt = TranspositionTable.from_memory_mb(tt_memory_mb) if tt_memory_mb > 0 else None
+        self.persist_tt = persist_tt
+
+        # Move ordering learned from cutoffs, shared by every sample and root move of a
+        # minimax_card call: history[side][kind] (side 1 = AI) gains depth^2 per
+        # cutoff, killers[depth][side] holds the last two cutoff kinds at that depth
+        self.KILLER_SLOTS = 2
+        self.history = None
+        self.killers = None
+        self._reset_move_ordering()
+
+        # Optional static leaf scores, kept across samples and moves (cleared by set_eval_weights)
+        self.eval_cache = EvalCache(eval_cache_size, eval_cache_eviction) if eval_cache_size > 0 else None
+
+        # Search states keep color-symmetric keys, so recolored positions share cache entries
+        self.color_symmetry = color_symmetry
+
+        # Anytime search: deepen until the per-move budget runs out
+        self.time_budget = time_budget
+        self.node_budget = node_budget
+        self.MAX_SEARCH_DEPTH = len(ZOBRIST_DEPTH) - 1
+        self.BUDGET_CHECK_INTERVAL = 64  # nodes between clock reads (~0.5 ms of search)
+        self.nodes_searched = 0
+        self.completed_depth = 0
+        self._deadline = None
+        self._node_limit = None
+        self._next_budget_check = float('inf')
+        self._deepening = False
+
+        # threading.Event polled with the budget; setting it aborts the running
+        # search with SearchCancelled (used by the tkinter background worker)
+        self.cancel_event = None
+
+        # Root scores of the last search: kind id -> minimax score summed over the
+        # sampled hands, or ISMCTS visit count (empty when no search ran)
+        self.last_move_scores = {}
+
+        # Pondering: replies searched during the opponent's turn, keyed by _ponder_key
+        self.ponder_cache = {}
+        self._ponder_warm = False  # keep the TT filled by ponder() for the next search
+
+        # Optional multi-process root search (see get_search_pool)
+        self.parallel_workers = parallel_workers
+
+        # Optional vectorized leaf evaluation
+        if batch_leaf_eval and np is None:
+            raise ImportError("batch_leaf_eval requires numpy")
+        self.batch_leaf_eval = batch_leaf_eval
+
+        # Optional search instrumentation; stats is None unless a search is recording
+        self.collect_stats = collect_stats or stats_callback is not None
+        self.stats_callback = stats_callback
+        self.stats = None
+        self.last_stats = None
 
     # -----------------------CORE METHODS-----------------------#
     def draw_card(self, deck=None):
@@ -99,6 +1025,7 @@ class AI_bot:
         if deck and len(deck) > 0:
             card = deck.pop()
             self.hand.append(card)
+            self.record_draw(card)
             return card
         return None
 
@@ -107,9 +1034,51 @@ class AI_bot:
         if deck and len(deck) > 0:
             drawn = deck.pop()
             self.hand.append(drawn)
+            self.record_draw(drawn)
             return drawn
         return None
 
+    def record_draw(self, card):
+        """Card-count tracker: a card reached AI's hand from outside (already appended)."""
+        self._mark_seen(card)
+
+    def record_discard(self, card, by_ai=False):
+        """
+        Card-count tracker: a card was put on the discard pile (also the
+        starting card). Cards played by the AI were already counted when drawn.
+        """
+        starting_card = not self.discard_history
+        self.discard_history.append(card)
+        if not by_ai:
+            self._mark_seen(card)
+        belief = self._get_belief()
+        if belief is None:
+            return
+        if by_ai:
+            draws = card_effect(card.text)[0]
+            if draws:
+                belief.observe_draw(draws, self.unknown_counts)
+        elif not starting_card:
+            belief.observe_play(kind_id(card), self.unknown_counts)
+
+    def record_opponent_draw(self, count=1):
+        """Opponent belief: the opponent drew count cards on their own turn."""
+        belief = self._get_belief()
+        if belief is not None:
+            belief.observe_draw(count, self.unknown_counts)
+
+    def record_opponent_pass(self, current_card):
+        """Opponent belief: the opponent showed they hold nothing playable on current_card."""
+        belief = self._get_belief()
+        if belief is not None:
+            belief.observe_pass(top_id(current_card), self.unknown_counts)
+
+    def _mark_seen(self, card):
+        """Take one copy of a card's kind out of the unknown counts."""
+        kind = kind_id(card)
+        if self.unknown_counts[kind] > 0:
+            self.unknown_counts[kind] -= 1
+
     def skip(self):
         """Placeholder for skip logic."""
         pass
@@ -123,21 +1092,17 @@ class AI_bot:
         Select a random valid card from hand to play.
         Draw a card if no valid moves are available.
         """
-        valid_card = []
-        for card in hand:
-            if (card.color == current_card.color or
-                card.text == current_card.text or
-                    card.text in ['wild', 'wild draw four']):
-                valid_card.append(card)
+        valid_card = valid_cards(hand, current_card)
 
         if not valid_card:
             if deck:
                 new_card = deck.pop()
                 self.hand.append(new_card)
+                self.record_draw(new_card)
                 return None
             return None
         else:
-            self.choosen_card = random.choice(valid_card)
+            self.choosen_card = self.rng.choice(valid_card)
             return self.choosen_card
 
     def play_card(self, random_card, speed=1):
@@ -148,13 +1113,7 @@ class AI_bot:
     # -----------------------HELPERS-----------------------#
     def _get_valid_cards(self, hand, current_card):
         """Return all cards from hand that can be legally played."""
-        valid = []
-        for card in hand:
-            if (card.color == current_card.color or
-                card.text == current_card.text or
-                    card.text in ['wild', 'wild draw four']):
-                valid.append(card)
-        return valid
+        return valid_cards(hand, current_card)
 
     def _count_colors(self, hand):
         """Count number of cards per color, including wilds."""
@@ -168,23 +1127,7 @@ class AI_bot:
 
     def _generate_full_deck(self):
         """Return a list of all cards in a standard Uno deck."""
-        colors = ['red', 'yellow', 'green', 'blue']
-        numbers = ['0', '1', '1', '2', '2', '3', '3', '4', '4', '5', '5',
-                   '6', '6', '7', '7', '8', '8', '9', '9']
-        actions = ['skip', 'reverse', 'draw two']
-        wilds = ['wild', 'wild draw four']
-
-        deck = []
-        for color in colors:
-            for number in numbers:
-                deck.append((color, number))
-            for action in actions:
-                deck.append((color, action))
-                deck.append((color, action))
-        for _ in range(4):
-            for wild in wilds:
-                deck.append(('gray40', wild))
-        return deck
+        return deck_cards()
 
     def _get_depth_for_difficulty(self):
         """Return minimax depth based on AI difficulty."""
@@ -194,160 +1137,696 @@ class AI_bot:
         """Return number of opponent hand samples based on difficulty."""
         return self.SAMPLE_CONFIG.get(self.difficulty, 4)
 
+    def _get_strategy(self):
+        """Return the search strategy ('minimax' or 'ismcts') for this bot."""
+        return self.strategy or self.STRATEGY_CONFIG.get(self.difficulty, 'minimax')
+
+    def _get_mcts_playouts(self):
+        """Return ISMCTS iterations per move based on difficulty."""
+        return self.mcts_playouts or self.MCTS_PLAYOUT_CONFIG.get(self.difficulty, 800)
+
+    def set_eval_weights(self, profile):
+        """
+        Switch to an evaluation weight profile ({term: weight}, missing terms
+        keep their current weight). Cached search results were scored with the
+        old weights, so the transposition table, evaluation cache and ponder
+        cache are cleared.
+        """
+        weights = dict(self.EVAL_WEIGHTS)
+        weights.update(profile)
+        self.eval_weights = eval_weight_tuple(weights)
+        self.EVAL_WEIGHTS = weights
+        if self.tt is not None:
+            self.tt.clear()
+        if self.eval_cache is not None:
+            self.eval_cache.clear()
+        self.ponder_cache = {}
+        self._ponder_warm = False
+
+    def _start_budget(self):
+        """Arm the per-move budget (if any) and reset the node counter."""
+        deadline = time.perf_counter() + self.time_budget if self.time_budget is not None else None
+        self._arm_budget(deadline, self.node_budget)
+
+    def _arm_budget(self, deadline, node_limit):
+        """Reset the node counter and set a perf_counter deadline and node limit."""
+        self.nodes_searched = 0
+        self._deadline = deadline
+        self._node_limit = node_limit
+        self._schedule_budget_check()
+
+    def _schedule_budget_check(self):
+        """Set the node count of the next budget check (never, when nothing can stop the search)."""
+        if self._deadline is None and self._node_limit is None and self.cancel_event is None:
+            self._next_budget_check = float('inf')
+            return
+        self._next_budget_check = self.nodes_searched + self.BUDGET_CHECK_INTERVAL
+        if self._node_limit is not None:
+            self._next_budget_check = min(self._next_budget_check, self._node_limit)
+
+    def _check_budget(self):
+        """Raise SearchTimeout once the budget is spent, else schedule the next check."""
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise SearchCancelled()
+        nodes = self.nodes_searched
+        if self._node_limit is not None and nodes >= self._node_limit:
+            raise SearchTimeout()
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise SearchTimeout()
+        self._schedule_budget_check()
+
     # -----------------------EVALUATION-----------------------#
+    # The helpers below work on both GameState and CompactState through their
+    # shared hand_size / special_count / max_color_count / playable_count methods.
     def _evaluate_state(self, state):
         """Compute heuristic value for a given game state."""
-        if len(state.ai_hand) == 0:
+        ai_cards = state.hand_size(True)
+        opp_cards = state.hand_size(False)
+        if ai_cards == 0:
             return 1000  # AI won
-        if len(state.opponent_hand) == 0:
+        if opp_cards == 0:
             return -1000  # Opponent won
 
+        w_hand, w_special, w_color, w_playability, w_winning = self.eval_weights
         score = 0.0
-        hand_size_diff = len(state.opponent_hand) - len(state.ai_hand)
-        score += hand_size_diff * 100
-        score += self._evaluate_special_cards(state) * 50
-        score += self._evaluate_color_potential(state) * 30
-        score += self._evaluate_playability(state) * 20
-        score += self._evaluate_winning_chance(state) * 150
+        hand_size_diff = opp_cards - ai_cards
+        score += hand_size_diff * w_hand
+        score += self._evaluate_special_cards(state) * w_special
+        score += self._evaluate_color_potential(state) * w_color
+        score += self._evaluate_playability(state) * w_playability
+        score += self._evaluate_winning_chance(state) * w_winning
+        return score
+
+    def _evaluate_leaf(self, state):
+        """_evaluate_state of a CompactState through the evaluation cache."""
+        cache = self.eval_cache
+        if cache is None:
+            return self._evaluate_state(state)
+        key = state.cache_key()
+        score = cache.get(key)
+        if score is None:
+            score = self._evaluate_state(state)
+            cache.put(key, score)
         return score
 
     def _evaluate_special_cards(self, state):
         """Score difference based on special cards in hand."""
-        ai_special, opp_special = 0, 0
-        for card in state.ai_hand:
-            if card.text in ['skip', 'reverse', 'draw two']:
-                ai_special += 1
-            elif card.text in ['wild', 'wild draw four']:
-                ai_special += 2
-        for card in state.opponent_hand:
-            if card.text in ['skip', 'reverse', 'draw two']:
-                opp_special += 1
-            elif card.text in ['wild', 'wild draw four']:
-                opp_special += 2
-        return ai_special - opp_special
+        return state.special_count(True) - state.special_count(False)
 
     def _evaluate_color_potential(self, state):
         """Evaluate advantage based on color concentration in hand."""
-        ai_max = max(state.ai_color_count.values()) if state.ai_color_count else 0
-        opp_max = max(state.opp_color_count.values()) if state.opp_color_count else 0
-        ai_conc = ai_max / max(len(state.ai_hand), 1)
-        opp_conc = opp_max / max(len(state.opponent_hand), 1)
+        ai_conc = state.max_color_count(True) / max(state.hand_size(True), 1)
+        opp_conc = state.max_color_count(False) / max(state.hand_size(False), 1)
         return ai_conc - opp_conc
 
     def _evaluate_playability(self, state):
         """Evaluate how many cards are playable for each player."""
-        ai_valid = len(state.get_valid_moves(True))
-        opp_valid = len(state.get_valid_moves(False))
-        return (ai_valid / max(len(state.ai_hand), 1)) - (opp_valid / max(len(state.opponent_hand), 1))
+        ai_valid = state.playable_count(True)
+        opp_valid = state.playable_count(False)
+        return (ai_valid / max(state.hand_size(True), 1)) - (opp_valid / max(state.hand_size(False), 1))
 
     def _evaluate_winning_chance(self, state):
         """Evaluate winning chance based on hand sizes."""
-        ai_cards = len(state.ai_hand)
-        opp_cards = len(state.opponent_hand)
+        ai_cards = state.hand_size(True)
+        opp_cards = state.hand_size(False)
         bonus = 2.0 if ai_cards <= 2 else 1.0 if ai_cards <= 4 else 0.0
         penalty = -2.0 if opp_cards <= 2 else -1.0 if opp_cards <= 4 else 0.0
         return bonus + penalty
 
+    def _evaluate_frontier(self, state, moves, is_ai):
+        """
+        Evaluate all children of a depth-1 node with evaluate_batch.
+        Returns (best score, best move) for the player to move.
+        """
+        rows = np.arange(len(moves))
+        kinds = np.array(moves)
+        ai_counts = np.array(state.ai_counts, dtype=np.int64)
+        opp_counts = np.array(state.opp_counts, dtype=np.int64)
+        if is_ai:
+            ai_counts = np.tile(ai_counts, (len(moves), 1))
+            ai_counts[rows, kinds] -= 1
+            opp_counts = np.broadcast_to(opp_counts, ai_counts.shape)
+        else:
+            opp_counts = np.tile(opp_counts, (len(moves), 1))
+            opp_counts[rows, kinds] -= 1
+            ai_counts = np.broadcast_to(ai_counts, opp_counts.shape)
+        scores = evaluate_batch(ai_counts, opp_counts, kinds, self.eval_weights)
+        best = int(scores.argmax() if is_ai else scores.argmin())
+        return float(scores[best]), moves[best]
+
     # -----------------------MINIMAX-----------------------#
-    def _order_moves(self, valid_cards, state):
-        """Order moves heuristically to improve alpha-beta pruning efficiency."""
-        def move_priority(card):
-            if len(state.ai_hand) == 1:
-                return 1000
-            if card.text == 'wild draw four':
-                return 900
-            elif card.text == 'wild':
-                return 800
-            elif card.text == 'draw two':
-                return 700
-            elif card.text in ['skip', 'reverse']:
-                return 600
-            elif card.color == state.current_card.color:
-                return 500
-            else:
-                return 400
-        return sorted(valid_cards, key=move_priority, reverse=True)
+    def _reset_move_ordering(self):
+        """Empty the history and killer tables."""
+        self.history = ([0] * NUM_KINDS, [0] * NUM_KINDS)
+        self.killers = [([None] * self.KILLER_SLOTS, [None] * self.KILLER_SLOTS)
+                        for _ in range(len(ZOBRIST_DEPTH))]
+
+    def _order_moves(self, valid_cards, state, depth=0, is_ai=True, tt_move=None):
+        """
+        Order moves to improve alpha-beta pruning: the transposition-table move,
+        then the killer moves of this depth and side, then the rest by history
+        score. Ties keep the static priority order. valid_cards are kind ids for
+        a CompactState (already in static order) or card objects for a GameState.
+        """
+        if isinstance(state, GameState):
+            top = (state.current_card.color, state.current_card.text)
+            valid_cards = sorted(valid_cards, reverse=True,
+                                 key=lambda card: _static_priority((card.color, card.text), top))
+            kinds = [kind_id(card) for card in valid_cards]
+        else:
+            kinds = valid_cards
+        history = self.history[is_ai]
+        killers = self.killers[depth][is_ai]
+
+        def priority(i):
+            kind = kinds[i]
+            if kind == tt_move:
+                return (2, 0)
+            if kind in killers:
+                return (1, -killers.index(kind))
+            return (0, history[kind])
+        return [valid_cards[i] for i in sorted(range(len(kinds)), key=priority, reverse=True)]
+
+    def _record_cutoff(self, move, depth, is_ai):
+        """Credit a move that caused a beta <= alpha cutoff in the ordering tables."""
+        self.history[is_ai][move] += depth * depth
+        killers = self.killers[depth][is_ai]
+        if killers[0] != move:
+            killers.pop()
+            killers.insert(0, move)
 
     def _minimax(self, state, depth, alpha, beta, is_maximizing):
-        """Recursive minimax with alpha-beta pruning to evaluate moves."""
+        """
+        Minimax with alpha-beta pruning to evaluate moves.
+        GameState inputs are converted to a CompactState first; compact inputs
+        are searched in place and are back in their original state on return.
+        """
+        if not isinstance(state, CompactState):
+            state = CompactState.from_game_state(state)
+        return self._search(state, depth, alpha, beta, is_maximizing)
+
+    def _search(self, state, depth, alpha, beta, is_maximizing):
+        """Recursive make/unmake alpha-beta search over a CompactState."""
+        self.nodes_searched += 1
+        if self.nodes_searched >= self._next_budget_check:
+            self._check_budget()
+        stats = self.stats
+        if stats is not None:
+            stats.nodes_by_depth[depth] = stats.nodes_by_depth.get(depth, 0) + 1
         if depth == 0 or state.is_terminal():
-            return self._evaluate_state(state)
-        if is_maximizing:
+            return self._evaluate_leaf(state)
+
+        # Transposition lookup
+        tt = self.tt
+        tt_move = None
+        if tt is not None:
+            order = None
+            if state.slot_keys is None:
+                key = state.key
+            else:
+                # shared by all recolorings: moves are stored in canonical colors
+                key, order = state.canonical()
+            key ^= ZOBRIST_DEPTH[depth]
+            if is_maximizing:
+                key ^= ZOBRIST_MAX_TO_MOVE
+            entry = tt.probe(key)
+            if entry is not None:
+                value, flag, tt_move = entry
+                if order is not None and tt_move is not None:
+                    tt_move = actual_move(tt_move, order)
+                if flag == TT_EXACT:
+                    return value
+                if flag == TT_LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if beta <= alpha:
+                    return value
+            elif self._deepening and depth > 1:
+                # reuse the previous iteration's best move at this node
+                hint_key = key ^ ZOBRIST_DEPTH[depth] ^ ZOBRIST_DEPTH[depth - 1]
+                hint = tt.entries.get(hint_key)
+                if hint is not None:
+                    tt_move = hint[2]
+                    if order is not None and tt_move is not None:
+                        tt_move = actual_move(tt_move, order)
+            alpha_orig, beta_orig = alpha, beta
+
+        valid_moves = state.get_valid_moves(is_maximizing)
+        if not valid_moves:
+            return self._evaluate_leaf(state)
+        if len(valid_moves) > 1:
+            valid_moves = self._order_moves(valid_moves, state, depth, is_maximizing, tt_move)
+        if stats is not None:
+            stats.expanded += 1
+
+        best_move = None
+        if depth == 1 and self.batch_leaf_eval:
+            # every child is a leaf: score them all in one NumPy call
+            best_eval, best_move = self._evaluate_frontier(state, valid_moves, is_maximizing)
+            self.nodes_searched += len(valid_moves)
+            if stats is not None:
+                stats.nodes_by_depth[0] = stats.nodes_by_depth.get(0, 0) + len(valid_moves)
+        elif is_maximizing:
             max_eval = float('-inf')
-            valid_moves = self._order_moves(state.get_valid_moves(True), state)
-            if not valid_moves:
-                return self._evaluate_state(state)
             for move in valid_moves:
-                next_state = state.apply_move(move, True)
-                eval_score = self._minimax(next_state, depth - 1, alpha, beta, False)
-                max_eval = max(max_eval, eval_score)
+                prev_top = state.do_move(move, True)
+                eval_score = self._search(state, depth - 1, alpha, beta, False)
+                state.undo_move(move, True, prev_top)
+                if eval_score > max_eval:
+                    max_eval, best_move = eval_score, move
                 alpha = max(alpha, eval_score)
                 if beta <= alpha:
+                    self._record_cutoff(move, depth, True)
+                    if stats is not None:
+                        stats.count_cutoff(depth, valid_moves.index(move))
                     break
-            return max_eval
+            best_eval = max_eval
         else:
             min_eval = float('inf')
-            valid_moves = self._order_moves(state.get_valid_moves(False), state)
-            if not valid_moves:
-                return self._evaluate_state(state)
             for move in valid_moves:
-                next_state = state.apply_move(move, False)
-                eval_score = self._minimax(next_state, depth - 1, alpha, beta, True)
-                min_eval = min(min_eval, eval_score)
+                prev_top = state.do_move(move, False)
+                eval_score = self._search(state, depth - 1, alpha, beta, True)
+                state.undo_move(move, False, prev_top)
+                if eval_score < min_eval:
+                    min_eval, best_move = eval_score, move
                 beta = min(beta, eval_score)
                 if beta <= alpha:
+                    self._record_cutoff(move, depth, False)
+                    if stats is not None:
+                        stats.count_cutoff(depth, valid_moves.index(move))
                     break
-            return min_eval
+            best_eval = min_eval
 
-    def minimax_card(self, hand, current_card):
-        """Select the best card to play using minimax over multiple sampled opponent hands."""
+        if tt is not None:
+            if best_eval <= alpha_orig:
+                flag = TT_UPPER
+            elif best_eval >= beta_orig:
+                flag = TT_LOWER
+            else:
+                flag = TT_EXACT
+            if order is not None and best_move is not None:
+                best_move = canonical_move(best_move, order)
+            tt.store(key, best_eval, flag, best_move)
+        return best_eval
+
+    def minimax_card(self, hand, current_card, view=None):
+        """
+        Select the best card to play using minimax over multiple sampled opponent
+        hands. Each distinct card kind is searched once; the chosen kind is
+        played as its first card in hand. view is what is known about the
+        opponent (see _opponent_view), the bot's own tracker by default.
+        """
+        self.last_move_scores = {}
         valid_cards = self._get_valid_cards(hand, current_card)
         if not valid_cards:
             return None
-        if len(valid_cards) == 1:
+        kinds = list(dict.fromkeys(kind_id(card) for card in valid_cards))
+        if len(kinds) == 1:
             self.choosen_card = valid_cards[0]
             return valid_cards[0]
 
         depth = self._get_depth_for_difficulty()
         num_samples = self._get_num_samples()
-        move_scores = {}
+        if self.tt is not None and not self.persist_tt and not self._ponder_warm:
+            self.tt.clear()
+        self._ponder_warm = False
+        self._start_budget()
+        self._reset_move_ordering()
 
-        for _ in range(num_samples):
-            opponent_hand_tuples = self._sample_opponent_hand(current_card)
-            opponent_hand_objects = [self._create_card_from_tuple(t) for t in opponent_hand_tuples]
-            for card in valid_cards:
-                initial_state = GameState(
-                    ai_hand=[c for c in hand if c != card],
-                    opponent_hand=opponent_hand_objects,
-                    current_card=card,
-                    deck_size=self.deck_size,
-                    current_player='opponent'
-                )
-                score = self._minimax(initial_state, depth, float('-inf'), float('inf'), False)
-                card_id = id(card)
-                move_scores[card_id] = move_scores.get(card_id, 0) + score
+        view = view or self._opponent_view()
+        samples = self._sample_opponent_hands(current_card, num_samples, view)
+        if self.collect_stats:
+            self._begin_stats(len(kinds), len(samples))
+
+        endgame_scores = None
+        if self._in_endgame(hand, view[1]):
+            endgame_scores = self._solve_within_budget(hand, current_card, kinds, samples)
+            forced = None
+            if endgame_scores is not None:
+                forced = next((kind for kind in kinds if endgame_scores[kind] == len(samples)), None)
+            if forced is not None:
+                # no-draw win against every sampled hand: skip the heuristic search
+                self.choosen_card = next(card for card in valid_cards if kind_id(card) == forced)
+                self._finish_stats()
+                return self.choosen_card
+
+        if self._deadline is None and self._node_limit is None:
+            pass_start = time.perf_counter()
+            move_scores = self._score_root_moves(hand, current_card, kinds, samples, depth)
+            self.completed_depth = depth
+            if self.stats is not None:
+                self.stats.iteration_times[depth] = time.perf_counter() - pass_start
+        else:
+            move_scores = self._iterative_deepening(hand, current_card, kinds, samples)
+            if move_scores is None and endgame_scores is None:
+                # not even depth 1 finished: fall back to the static move order
+                fallback = GameState(hand, [], current_card, self.deck_size, 'ai')
+                self.choosen_card = self._order_moves(valid_cards, fallback)[0]
+                self._finish_stats()
+                return self.choosen_card
 
-        best_card_id = max(move_scores, key=move_scores.get)
-        best_card = next(card for card in valid_cards if id(card) == best_card_id)
+        if endgame_scores is not None:
+            # no-draw solver results decide, heuristic scores break ties
+            move_scores = move_scores or {}
+            best_kind = max(endgame_scores, key=lambda kind: (endgame_scores[kind], move_scores.get(kind, 0)))
+        else:
+            best_kind = max(move_scores, key=move_scores.get)
+        self.last_move_scores = dict(move_scores)
+        best_card = next(card for card in valid_cards if kind_id(card) == best_kind)
         self.choosen_card = best_card
+        self._finish_stats()
         return best_card
 
+    def _begin_stats(self, num_moves, num_samples):
+        """Start a SearchStats for this minimax_card call."""
+        stats = SearchStats(num_moves)
+        stats.sample_times = [0.0] * num_samples
+        if self.tt is not None:
+            stats.tt_hits, stats.tt_misses = -self.tt.hits, -self.tt.misses
+        if self.eval_cache is not None:
+            stats.eval_cache_hits, stats.eval_cache_misses = -self.eval_cache.hits, -self.eval_cache.misses
+        stats.elapsed = -time.perf_counter()
+        self.stats = stats
+
+    def _finish_stats(self):
+        """Close the running SearchStats (if any) into last_stats and report it."""
+        stats = self.stats
+        if stats is None:
+            return
+        self.stats = None
+        stats.elapsed += time.perf_counter()
+        stats.nodes = self.nodes_searched
+        stats.completed_depth = self.completed_depth
+        if self.tt is not None:
+            stats.tt_hits += self.tt.hits
+            stats.tt_misses += self.tt.misses
+        if self.eval_cache is not None:
+            stats.eval_cache_hits += self.eval_cache.hits
+            stats.eval_cache_misses += self.eval_cache.misses
+        self.last_stats = stats
+        if self.stats_callback is not None:
+            self.stats_callback(stats)
+
+    def _score_root_moves(self, hand, current_card, kinds, samples, depth):
+        """Sum each root kind's minimax score over all sampled opponent hands ({kind: score})."""
+        if self.parallel_workers:
+            return self._score_root_moves_parallel(hand, current_card, kinds, samples, depth)
+        move_scores = {}
+        ai_counts = hand_counts(hand)
+        current_top = top_id(current_card)
+        stats = self.stats
+        for i, opponent_counts in enumerate(samples):
+            if stats is not None:
+                sample_start = time.perf_counter()
+            root_state = CompactState(ai_counts, opponent_counts, current_top, self.deck_size, 'ai',
+                                      self.color_symmetry)
+            for kind in kinds:
+                initial_state = root_state.apply_move(kind, True)
+                score = self._minimax(initial_state, depth, float('-inf'), float('inf'), False)
+                move_scores[kind] = move_scores.get(kind, 0) + score
+            if stats is not None:
+                stats.sample_times[i] += time.perf_counter() - sample_start
+        return move_scores
+
+    def _score_root_moves_parallel(self, hand, current_card, kinds, samples, depth):
+        """
+        Same as _score_root_moves with every (sample, kind) search run on the
+        shared process pool. Scores are added in the sequential order, so the
+        sums match the in-process search exactly.
+        """
+        ai_counts = hand_counts(hand)
+        current_top = top_id(current_card)
+        deadline = None
+        if self._deadline is not None:
+            deadline = time.time() + (self._deadline - time.perf_counter())
+        jobs = []
+        for opponent_counts in samples:
+            root_state = CompactState(ai_counts, opponent_counts, current_top, self.deck_size, 'ai')
+            for kind in kinds:
+                jobs.append(root_state.apply_move(kind, True).pack())
+        node_limit = None
+        if self._node_limit is not None:
+            node_limit = max(1, (self._node_limit - self.nodes_searched) // len(jobs))
+        jobs = [(packed, depth, self._deepening, deadline, node_limit, self.eval_weights, self.color_symmetry)
+                for packed in jobs]
+
+        pool = get_search_pool(self.parallel_workers)
+        chunksize = max(1, len(jobs) // (self.parallel_workers * 4))
+        results = list(pool.map(_search_root_job, jobs, chunksize=chunksize))
+        self.nodes_searched += sum(nodes for _, nodes in results)
+        if any(score is None for score, _ in results):
+            raise SearchTimeout()
+
+        move_scores = {}
+        results = iter(results)
+        for _ in samples:
+            for kind in kinds:
+                score, _ = next(results)
+                move_scores[kind] = move_scores.get(kind, 0) + score
+        return move_scores
+
+    def _iterative_deepening(self, hand, current_card, kinds, samples):
+        """
+        Deepen one ply at a time until the budget runs out.
+        Returns the move scores of the deepest completed iteration, or None.
+        """
+        # the search cannot go deeper than the cards left in both hands
+        max_depth = min(self.MAX_SEARCH_DEPTH, len(hand) + max(sum(counts) for counts in samples))
+        order = list(kinds)
+        completed = None
+        self.completed_depth = 0
+        self._deepening = True
+        try:
+            for depth in range(1, max_depth + 1):
+                iteration_start = time.perf_counter()
+                try:
+                    move_scores = self._score_root_moves(hand, current_card, order, samples, depth)
+                except SearchTimeout:
+                    break
+                finally:
+                    if self.stats is not None:
+                        self.stats.iteration_times[depth] = time.perf_counter() - iteration_start
+                completed = move_scores
+                self.completed_depth = depth
+                best_kind = max(move_scores, key=move_scores.get)
+                order.sort(key=lambda kind: kind != best_kind)  # best move first
+        finally:
+            self._deepening = False
+        return completed
+
+    # -----------------------ENDGAME SOLVER-----------------------#
+    def _in_endgame(self, hand, opponent_hand_size):
+        """True when both hands are within this difficulty's ENDGAME_CONFIG limits."""
+        limits = self.ENDGAME_CONFIG.get(self.difficulty)
+        return limits is not None and len(hand) <= limits[0] and opponent_hand_size <= limits[1]
+
+    def _solve_within_budget(self, hand, current_card, kinds, samples):
+        """
+        _solve_root_moves limited to ENDGAME_BUDGET_SHARE of the time and nodes
+        left in the move's budget, so the heuristic search keeps the rest.
+        Returns None if the solve did not finish.
+        """
+        deadline, node_limit = self._deadline, self._node_limit
+        if deadline is not None:
+            now = time.perf_counter()
+            self._deadline = now + (deadline - now) * self.ENDGAME_BUDGET_SHARE
+        if node_limit is not None:
+            self._node_limit = self.nodes_searched + int((node_limit - self.nodes_searched) *
+                                                         self.ENDGAME_BUDGET_SHARE)
+        self._schedule_budget_check()
+        try:
+            return self._solve_root_moves(hand, current_card, kinds, samples)
+        except SearchTimeout:
+            return None
+        finally:
+            self._deadline, self._node_limit = deadline, node_limit
+            self._schedule_budget_check()
+
+    def _solve_root_moves(self, hand, current_card, kinds, samples):
+        """Sum each root kind's _solve value over all sampled opponent hands ({kind: value})."""
+        if len(self.endgame_memo) > self.ENDGAME_MEMO_LIMIT:
+            self.endgame_memo.clear()
+        move_scores = {}
+        ai_counts = hand_counts(hand)
+        current_top = top_id(current_card)
+        for opponent_counts in samples:
+            state = CompactState(ai_counts, opponent_counts, current_top, self.deck_size, 'ai', self.color_symmetry)
+            for kind in kinds:
+                prev_top = state.do_move(kind, True)
+                value = self._solve(state, False)
+                state.undo_move(kind, True, prev_top)
+                move_scores[kind] = move_scores.get(kind, 0) + value
+        return move_scores
+
+    def _solve(self, state, is_ai, passed=False):
+        """
+        Game value under the search's no-draw move model: 1 if the AI wins, -1 if
+        it loses, 0 if both players get stuck. A player without a legal card
+        passes instead of drawing, so this approximates the real game value.
+        Results are memoized on the position key (hand multisets and top card),
+        the side to move and whether the previous player passed.
+        """
+        if state.ai_size == 0:
+            return 1
+        if state.opp_size == 0:
+            return -1
+        self.nodes_searched += 1
+        if self.stats is not None:
+            self.stats.endgame_nodes += 1
+        if self.nodes_searched >= self._next_budget_check:
+            self._check_budget()
+        memo_key = (state.cache_key(), is_ai, passed)
+        value = self.endgame_memo.get(memo_key)
+        if value is not None:
+            return value
+
+        moves = state.get_valid_moves(is_ai)
+        if not moves:
+            value = 0 if passed else self._solve(state, not is_ai, True)
+        elif is_ai:
+            value = -1
+            for move in moves:
+                prev_top = state.do_move(move, True)
+                value = max(value, self._solve(state, False))
+                state.undo_move(move, True, prev_top)
+                if value == 1:
+                    break
+        else:
+            value = 1
+            for move in moves:
+                prev_top = state.do_move(move, False)
+                value = min(value, self._solve(state, True))
+                state.undo_move(move, False, prev_top)
+                if value == -1:
+                    break
+        self.endgame_memo[memo_key] = value
+        return value
+
+    # -----------------------ISMCTS-----------------------#
+    def ismcts_card(self, hand, current_card, view=None):
+        """Select the card to play with information-set MCTS (see ismcts_uno)."""
+        self.last_move_scores = {}
+        valid_cards = self._get_valid_cards(hand, current_card)
+        if not valid_cards:
+            return None
+        if len({kind_id(card) for card in valid_cards}) == 1:
+            self.choosen_card = valid_cards[0]
+            return valid_cards[0]
+
+        unknown_counts, opponent_hand_size, _ = view or self._opponent_view()
+        best_kind, visits = ismcts_search(hand_counts(hand), unknown_counts, opponent_hand_size,
+                                     self.deck_size, top_id(current_card),
+                                     playouts=self._get_mcts_playouts(), time_budget=self.time_budget,
+                                     rng=self.rng, cancel_event=self.cancel_event)
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise SearchCancelled()
+        self.last_move_scores = visits
+        self.choosen_card = next(card for card in valid_cards if kind_id(card) == best_kind)
+        return self.choosen_card
+
+    # -----------------------PONDERING-----------------------#
+    def ponder(self, current_card):
+        """
+        Run during the opponent's turn: search the AI's reply to each card the
+        opponent is likely to play on current_card and cache it for choose_card.
+        Candidates are the unseen kinds that are legal and keep the turn order
+        (number cards and plain wilds, one per color), most copies unseen first.
+        Each reply is searched on its own view of the opponent (tracker and a
+        belief copy that observed the play), so the bot's tracker is only read.
+        The table is kept for the next search, so a miss starts warm. The
+        caller must stop pondering (cancel_event) and wait for it to return
+        before changing the bot's state: the searches share its caches.
+        """
+        self.ponder_cache = {}
+        hand = list(self.hand)
+        unknown_counts, opponent_hand_size, belief = self._opponent_view()
+        try:
+            for card in self._ponder_candidates(current_card):
+                # the opponent's side as it will be once they have played card
+                kind = kind_id(card)
+                counts = list(unknown_counts)
+                counts[kind] -= 1
+                pondered_belief = None
+                if belief is not None:
+                    pondered_belief = belief.copy()
+                    pondered_belief.observe_play(kind, counts)
+                view = (counts, opponent_hand_size - 1, pondered_belief)
+                self._ponder_warm = self.tt is not None  # one table across the candidates
+                reply = self._search_card(hand, card, view)
+                self.ponder_cache[self._ponder_key(hand, card, view)] = kind_id(reply) if reply else None
+        finally:
+            self._ponder_warm = self.tt is not None
+        return len(self.ponder_cache)
+
+    def _ponder_candidates(self, current_card):
+        """Likely opponent plays on current_card as card objects, most likely first."""
+        legal = hand_mask(self.unknown_counts) & PLAYABLE_MASK[top_id(current_card)]
+        candidates = []
+        for kind in sorted(mask_kinds(legal), key=lambda k: -self.unknown_counts[k]):
+            color, text = KIND_CARDS[kind]
+            draws, same_player, choose_color = card_effect(text)
+            if draws or same_player:
+                continue  # the AI's hand or turn would change first
+            if choose_color:
+                candidates.extend(self._create_card_from_tuple((c, text)) for c in CARD_COLORS)
+            else:
+                candidates.append(self._create_card_from_tuple((color, text)))
+        return candidates
+
+    def _ponder_key(self, hand, current_card, view=None):
+        """
+        What a reply search depends on, so a cached reply is only reused when
+        valid. The belief enters by its observation count: a pondered reply
+        was searched on a copy that observed the same play as the bot's own
+        belief (same filter update, different random particles).
+        """
+        unknown_counts, opponent_hand_size, belief = view or self._opponent_view()
+        key = (self._get_strategy(), top_id(current_card), tuple(hand_counts(hand)),
+               tuple(unknown_counts), opponent_hand_size, belief.observations if belief is not None else None)
+        if self._get_strategy() == 'ismcts':
+            key += (self.deck_size,)  # only rollouts look at the deck
+        return key
+
     # -----------------------DETERMINIZATION-----------------------#
     def _get_unknown_cards(self, current_card):
-        """Return cards that are not known to AI (for sampling opponent hand)."""
-        full_deck = self._generate_full_deck()
-        known = {(card.color, card.text) for card in self.hand}
-        known.add((current_card.color, current_card.text))
-        for card in self.discard_history:
-            known.add((card.color, card.text))
-        return [c for c in full_deck if c not in known]
-
-    def _sample_opponent_hand(self, current_card):
-        """Randomly sample a possible opponent hand from unknown cards."""
-        unknown = self._get_unknown_cards(current_card)
-        if len(unknown) < self.opponent_hand_size:
-            return random.sample(unknown, len(unknown))
-        return random.sample(unknown, self.opponent_hand_size)
+        """Return (color, text) of every card not known to AI, one entry per copy."""
+        return [KIND_CARDS[k] for k, n in enumerate(self.unknown_counts) for _ in range(n)]
+
+    def _sample_opponent_hand(self, current_card, view=None):
+        """
+        Randomly sample a possible opponent hand (as kind ids) straight from the
+        card-count tracker. current_card is expected to be recorded already.
+        """
+        unknown_counts, opponent_hand_size, _ = view or self._opponent_view()
+        size = min(opponent_hand_size, sum(unknown_counts))
+        return self.rng.sample(range(NUM_KINDS), size, counts=unknown_counts)
+
+    def _sample_opponent_hands(self, current_card, count, view=None):
+        """count opponent hands as kind-count lists, from the belief when the difficulty has one."""
+        view = view or self._opponent_view()
+        unknown_counts, opponent_hand_size, belief = view
+        if belief is not None:
+            return belief.sample(count, unknown_counts, opponent_hand_size)
+        samples = []
+        for _ in range(count):
+            opponent_counts = [0] * NUM_KINDS
+            for kind in self._sample_opponent_hand(current_card, view):
+                opponent_counts[kind] += 1
+            samples.append(opponent_counts)
+        return samples
+
+    def _opponent_view(self):
+        """(unknown counts, opponent hand size, belief or None): what a search knows of the opponent."""
+        return self.unknown_counts, self.opponent_hand_size, self._get_belief()
+
+    def _get_belief(self):
+        """The bot's OpponentBelief, created from the tracker on first use (None if disabled)."""
+        if self.belief is None:
+            particles = self.BELIEF_CONFIG.get(self.difficulty)
+            if particles:
+                self.belief = OpponentBelief(particles, self.unknown_counts, self.opponent_hand_size, self.rng)
+        return self.belief
 
     def _create_card_from_tuple(self, tup):
         """Create a simple card object from (color, text) tuple."""
@@ -366,4 +1845,18 @@ class AI_bot:
 
     def choose_card(self, hand, current_card):
         """Main AI function to choose the next card to play."""
-        return self.minimax_card(hand, current_card)
+        if self.ponder_cache:
+            reply = self.ponder_cache.get(self._ponder_key(hand, current_card), -1)
+            self.ponder_cache = {}
+            if reply != -1:
+                self.last_move_scores = {}
+                self.choosen_card = next((card for card in self._get_valid_cards(hand, current_card)
+                                          if kind_id(card) == reply), None)
+                return self.choosen_card
+        return self._search_card(hand, current_card)
+
+    def _search_card(self, hand, current_card, view=None):
+        """Search for a card with the bot's strategy (no ponder cache)."""
+        if self._get_strategy() == 'ismcts':
+            return self.ismcts_card(hand, current_card, view)
+        return self.minimax_card(hand, current_card, view)
@@ -1,90 +1,197 @@
 # ai_performance_test.py
+import argparse
+import json
+import math
+import os
 import random
-from AI_uno import AI_bot, GameState
-from main_game import spawn_deck, spawn_hands, color, number, action, wild
+from multiprocessing import Pool
+from AI_uno import AI_bot
+from game_log import GameLogWriter, GameRecorder
+from uno_core import UnoGame, color, valid_cards
 
 NUM_GAMES = 1000
 DIFFICULTIES = ['easy', 'medium', 'hard']
-
-# ---------------- MINIMAL CARD CLASS ---------------- #
-class Card:
-    """Minimal card class for simulation."""
-    def __init__(self, color, text):
-        self.color = color
-        self.text = text
+BASE_SEED = 0
 
 # ---------------- SIMPLE SIMULATED PLAYER ---------------- #
 class RandomPlayer:
     """Simulates a typical player that plays any valid card randomly."""
-    def __init__(self, hand):
+    def __init__(self, hand, rng=random):
         self.hand = hand
+        self.rng = rng
 
     def choose_card(self, current_card):
-        valid_cards = [card for card in self.hand if
-                       card.color == current_card.color or
-                       card.text == current_card.text or
-                       card.text in ['wild', 'wild draw four']]
-        if valid_cards:
-            return random.choice(valid_cards)
+        playable = valid_cards(self.hand, current_card)
+        if playable:
+            return self.rng.choice(playable)
         return None
 
+    def choose_color(self):
+        return self.rng.choice(color)
+
 # ---------------- GAME SIMULATION ---------------- #
-def simulate_single_game(difficulty):
-    deck = spawn_deck()
-    ai_hand = spawn_hands(deck)
-    player_hand = spawn_hands(deck)
-
-    # Convert main_game.Card objects to minimal Card objects
-    ai_hand = [Card(c.color, c.text) for c in ai_hand]
-    player_hand = [Card(c.color, c.text) for c in player_hand]
-
-    # Initialize AI and random player
-    ai = AI_bot("AI", deck.copy(), ai_hand.copy(), difficulty=difficulty)
-    player = RandomPlayer(player_hand.copy())
-
-    # Initialize starting card
-    current_card_obj = deck.pop()
-    while current_card_obj.text not in number:
-        deck.append(current_card_obj)
-        random.shuffle(deck)
-        current_card_obj = deck.pop()
-    current_card = Card(current_card_obj.color, current_card_obj.text)
-
-    # Game loop
-    current_player = 'ai'  # AI starts
-    while len(ai.hand) > 0 and len(player.hand) > 0:
-        if current_player == 'ai':
-            chosen = ai.choose_card(ai.hand, current_card)
-            if chosen:
-                ai.hand.remove(chosen)
-                current_card = chosen
-            else:
-                if deck:
-                    c = deck.pop()
-                    current_card = Card(c.color, c.text)
-                    ai.hand.append(current_card)
-            current_player = 'player'
+def game_seed(base_seed, difficulty, game_index):
+    """Seed of one game; random.Random(game_seed(...)) replays it exactly."""
+    return f"{base_seed}:{difficulty}:{game_index}"
+
+def simulate_single_game(difficulty, seed=None, strategy=None, recorder=None, eval_weights=None):
+    """
+    Play one AI vs RandomPlayer game under the uno_core rules (action cards
+    included); a seed makes it reproducible. strategy overrides the AI's
+    per-difficulty search strategy; recorder (a game_log.GameRecorder) logs
+    every move; eval_weights is the AI's evaluation weight profile.
+    Returns 'ai', 'player' or 'draw'.
+    """
+    rng = random.Random(seed)
+    game = UnoGame.deal(('ai', 'player'), rng=rng)
+    if recorder is not None:
+        for name, hand in game.hands.items():
+            recorder.deal(name, hand)
+        recorder.start(game.current_card)
+
+    # Initialize AI and random player (they share the game's hand lists)
+    ai = AI_bot("AI", game.deck, game.hands['ai'], difficulty=difficulty, rng=rng, strategy=strategy,
+                eval_weights=eval_weights)
+    player = RandomPlayer(game.hands['player'], rng)
+    ai.record_discard(game.current_card)
+
+    # Game loop, AI starts
+    while not game.is_over():
+        if game.current_player == 'ai':
+            chosen = ai.choose_card(ai.hand, game.current_card)
+            chosen_color = ai.choose_color() if chosen else None
+        else:
+            chosen = player.choose_card(game.current_card)
+            chosen_color = player.choose_color() if chosen else None
+
+        mover = game.current_player
+        if chosen:
+            drawn = game.play(chosen, chosen_color)
+            ai.record_discard(chosen, by_ai=mover == 'ai')
+            drawer = game.opponent(mover)
+            if recorder is not None:
+                recorder.play(mover, chosen, drawn)
         else:
-            chosen = player.choose_card(current_card)
-            if chosen:
-                player.hand.remove(chosen)
-                current_card = chosen
-            else:
-                if deck:
-                    c = deck.pop()
-                    current_card = Card(c.color, c.text)
-                    player.hand.append(current_card)
-            current_player = 'ai'
-
-    return 'ai' if len(ai.hand) == 0 else 'player'
+            drawn = game.draw(mover)
+            game.pass_turn()
+            drawer = mover
+            if recorder is not None:
+                if drawn:
+                    recorder.draw(mover, drawn)
+                recorder.pass_turn(mover)
+        if drawer == 'ai':
+            for card in drawn:
+                ai.record_draw(card)
+        elif not chosen:
+            ai.record_opponent_pass(game.current_card)
+            ai.record_opponent_draw(len(drawn))
+        ai.opponent_hand_size = len(player.hand)
+        ai.deck_size = len(game.deck)
+
+    if recorder is not None:
+        recorder.end(game.winner())
+    return game.winner()
+
+# ---------------- TOURNAMENT RUNNER ---------------- #
+def _play_game(job):
+    """Pool worker: play one seeded game and return (game_index, seed, winner, log bytes or None)."""
+    difficulty, game_index, seed, strategy, record, eval_weights = job
+    recorder = GameRecorder(game_index) if record else None
+    winner = simulate_single_game(difficulty, seed, strategy, recorder, eval_weights)
+    return game_index, seed, winner, recorder.to_bytes() if record else None
+
+def iter_tournament(difficulty, num_games=NUM_GAMES, workers=None, base_seed=BASE_SEED, strategy=None,
+                    log=None, eval_weights=None):
+    """
+    Play num_games seeded games sharded over a process pool and yield
+    (game_index, seed, winner) as each game finishes (in completion order).
+    workers=1 plays in this process. log (a game_log.GameLogWriter) receives
+    every finished game, keyed by its game index. eval_weights is passed to
+    every game's AI_bot.
+    """
+    workers = workers or os.cpu_count() or 1
+    jobs = [(difficulty, i, game_seed(base_seed, difficulty, i), strategy, log is not None, eval_weights)
+            for i in range(num_games)]
+    if workers == 1:
+        results = map(_play_game, jobs)
+    else:
+        chunksize = max(1, min(16, num_games // (workers * 8)))
+        pool = Pool(workers)
+        results = pool.imap_unordered(_play_game, jobs, chunksize=chunksize)
+    try:
+        for game_index, seed, winner, record in results:
+            if log is not None:
+                log.write_game(record)
+            yield game_index, seed, winner
+    finally:
+        if workers != 1:
+            pool.terminate()
+
+def wilson_interval(wins, games, z=1.96):
+    """Wilson score interval of a win rate (95% by default), as fractions."""
+    if games == 0:
+        return 0.0, 0.0
+    p = wins / games
+    denom = 1 + z * z / games
+    center = (p + z * z / (2 * games)) / denom
+    margin = z * math.sqrt(p * (1 - p) / games + z * z / (4 * games * games)) / denom
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+def run_tournament(difficulty, num_games=NUM_GAMES, workers=None, base_seed=BASE_SEED, strategy=None,
+                   log=None, eval_weights=None):
+    """Merge streamed game results into a win-rate summary dict."""
+    wins = 0
+    draws = 0
+    games = 0
+    for game_index, seed, winner in iter_tournament(difficulty, num_games, workers, base_seed, strategy, log,
+                                                    eval_weights):
+        games += 1
+        if winner == 'ai':
+            wins += 1
+        elif winner == 'draw':
+            draws += 1
+    low, high = wilson_interval(wins, games)
+    return {
+        'difficulty': difficulty,
+        'games': games,
+        'wins': wins,
+        'draws': draws,
+        'win_rate': wins / games if games else 0.0,
+        'ci_low': low,
+        'ci_high': high,
+    }
 
 # ---------------- RUN SIMULATION ---------------- #
 if __name__ == "__main__":
-    for difficulty in DIFFICULTIES:
-        wins = 0
-        for _ in range(NUM_GAMES):
-            winner = simulate_single_game(difficulty)
-            if winner == 'ai':
-                wins += 1
-        win_rate = wins / NUM_GAMES * 100
-        print(f"Difficulty: {difficulty.capitalize()} - AI Win Rate: {win_rate:.2f}%")
+    parser = argparse.ArgumentParser(description="Simulate AI vs random-player games per difficulty.")
+    parser.add_argument('--games', type=int, default=NUM_GAMES, help="games per difficulty")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--seed', type=int, default=BASE_SEED, help="base seed of the tournament")
+    parser.add_argument('--difficulty', choices=DIFFICULTIES, action='append',
+                        help="difficulty to run (repeatable, default: all)")
+    parser.add_argument('--strategy', choices=['minimax', 'ismcts'],
+                        help="AI search strategy (default: per-difficulty STRATEGY_CONFIG)")
+    parser.add_argument('--replay', type=int, metavar='GAME_INDEX',
+                        help="replay a single game of the tournament and print its winner")
+    parser.add_argument('--log', metavar='PATH', help="append every game to this binary game log")
+    parser.add_argument('--eval-weights', metavar='JSON', help="evaluation weight profile file (see eval_tuner.py)")
+    args = parser.parse_args()
+
+    eval_weights = None
+    if args.eval_weights:
+        with open(args.eval_weights) as f:
+            eval_weights = json.load(f)
+
+    log = GameLogWriter(args.log) if args.log else None
+    for difficulty in args.difficulty or DIFFICULTIES:
+        if args.replay is not None:
+            seed = game_seed(args.seed, difficulty, args.replay)
+            print(f"Difficulty: {difficulty.capitalize()} - game {args.replay} ({seed}): "
+                  f"{simulate_single_game(difficulty, seed, args.strategy, eval_weights=eval_weights)}")
+            continue
+        result = run_tournament(difficulty, args.games, args.workers, args.seed, args.strategy, log, eval_weights)
+        print(f"Difficulty: {difficulty.capitalize()} - AI Win Rate: {result['win_rate'] * 100:.2f}% "
+              f"(95% CI {result['ci_low'] * 100:.2f}-{result['ci_high'] * 100:.2f}%, "
+              f"{result['games']} games, {result['draws']} drawn)")
+    if log is not None:
+        log.close()
@@ -0,0 +1,238 @@
+# batch_simulator.py
+# lockstep simulator: thousands of two-player games advanced together as NumPy arrays
+import argparse
+import random
+import time
+import numpy as np
+from AI_uno import AI_bot
+from ai_performance_test import wilson_interval
+from uno_core import (Card, CARD_COLORS, KIND_CARDS, KIND_ID, NUM_KINDS, TOP_CARDS, TOP_ID, PLAYABLE_MASK,
+                      number, card_effect, deck_cards, kind_id)
+
+NUM_GAMES = 100000
+HAND_SIZE = 7
+AI_SEAT, RANDOM_SEAT = 0, 1  # seat 0 moves first, like 'ai' in simulate_single_game
+DRAW = -1                    # winner value of a stalemate
+
+# ---------------- RULE TABLES ---------------- #
+# the uno_core rules as arrays indexed by kind id / top id
+PLAYABLE = np.array([[mask >> k & 1 for k in range(NUM_KINDS)] for mask in PLAYABLE_MASK], dtype=np.int16)
+_effects = [card_effect(text) for _, text in KIND_CARDS]
+EFFECT_DRAWS = np.array([draws for draws, _, _ in _effects], dtype=np.int16)
+EFFECT_SAME_PLAYER = np.array([same for _, same, _ in _effects], dtype=bool)
+# top id after playing kind k with color index c (non-wilds keep their own id)
+COLORED_TOP = np.array([[TOP_ID[(c, text)] if choose else k for c in CARD_COLORS]
+                        for k, ((_, text), (_, _, choose)) in enumerate(zip(KIND_CARDS, _effects))],
+                       dtype=np.int16)
+IS_NUMBER = np.array([text in number for _, text in KIND_CARDS], dtype=bool)
+DECK_KINDS = np.array([KIND_ID[card] for card in deck_cards()], dtype=np.int16)
+DECK_LEN = len(DECK_KINDS) - 2 * HAND_SIZE - 1  # cards left after dealing and the start card
+
+# ---------------- BATCHED GAMES ---------------- #
+class BatchSimulator:
+    """
+    N games under the uno_core rules held as arrays: hand counts (N, 2,
+    NUM_KINDS), deck order (N, DECK_LEN) with a draw position, top id and
+    seat to move. Every step advances each unfinished game by one turn.
+    Random seats move with vectorized legality and a random card choice
+    (weighted by copies, like RandomPlayer); if difficulty is set, seat 0 is
+    an AI_bot per game and is asked for its move one game at a time.
+    """
+    def __init__(self, num_games, seed=0, difficulty=None, strategy=None):
+        self.n = num_games
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self._deal()
+
+        self.turn = np.zeros(num_games, dtype=np.int8)          # AI_SEAT starts
+        self.passes = np.zeros(num_games, dtype=np.int8)
+        self.active = np.ones(num_games, dtype=bool)
+        self.winner = np.full(num_games, DRAW, dtype=np.int8)
+        self.turns = np.zeros(num_games, dtype=np.int32)
+        self.cards_drawn = np.zeros(num_games, dtype=np.int32)
+        self.play_counts = np.zeros(NUM_KINDS, dtype=np.int64)   # cards played per kind
+
+        self.bots = None
+        if difficulty is not None:
+            self.bots = [self._make_bot(g, difficulty, strategy) for g in range(num_games)]
+
+    def _deal(self):
+        """Shuffle every deck, deal both hands and turn up a number card as the start card."""
+        n = self.n
+        rows = np.arange(n)
+        decks = DECK_KINDS[np.argsort(self.rng.random((n, len(DECK_KINDS))), axis=1)]
+        self.hands = np.zeros((n, 2, NUM_KINDS), dtype=np.int16)
+        for seat in range(2):
+            dealt = decks[:, seat * HAND_SIZE:(seat + 1) * HAND_SIZE]
+            np.add.at(self.hands, (rows[:, None], seat, dealt), 1)
+
+        # first number card of the rest is the start card; the others are reshuffled
+        rest = decks[:, 2 * HAND_SIZE:]
+        start = IS_NUMBER[rest].argmax(axis=1)
+        self.top = rest[rows, start].astype(np.int16)
+        keep = np.ones(rest.shape, dtype=bool)
+        keep[rows, start] = False
+        rest = rest[keep].reshape(n, DECK_LEN)
+        self.deck = rest[rows[:, None], np.argsort(self.rng.random(rest.shape), axis=1)]
+        self.deck_pos = np.zeros(n, dtype=np.int16)
+
+    def _make_bot(self, g, difficulty, strategy):
+        """AI_bot for seat 0 of game g, holding card objects mirroring the count arrays."""
+        hand = [Card(*KIND_CARDS[k]) for k in np.repeat(np.arange(NUM_KINDS), self.hands[g, AI_SEAT])]
+        bot = AI_bot("AI", [], hand, difficulty=difficulty, strategy=strategy,
+                     rng=random.Random(f"{self.seed}:{g}"))
+        bot.deck_size = DECK_LEN
+        bot.record_discard(Card(*TOP_CARDS[self.top[g]]))
+        return bot
+
+    # ---------------- RULES ---------------- #
+    def _draw(self, games, seats, counts):
+        """Each games[i] moves up to counts[i] cards from its deck to seat seats[i]."""
+        for d in range(int(counts.max()) if len(counts) else 0):
+            sel = (counts > d) & (self.deck_pos[games] < DECK_LEN)
+            g, s = games[sel], seats[sel]
+            kinds = self.deck[g, self.deck_pos[g]]
+            self.deck_pos[g] += 1
+            self.hands[g, s, kinds] += 1
+            self.cards_drawn[g] += 1
+            if self.bots is not None:
+                for gi, kind in zip(g[s == AI_SEAT], kinds[s == AI_SEAT]):
+                    card = Card(*KIND_CARDS[kind])
+                    self.bots[gi].hand.append(card)
+                    self.bots[gi].record_draw(card)
+
+    def _play(self, games, kinds, colors):
+        """The player to move in each game plays kinds[i] (wilds take colors[i])."""
+        if not len(games):
+            return
+        seats = self.turn[games]
+        others = 1 - seats
+        self.hands[games, seats, kinds] -= 1
+        self.passes[games] = 0
+        self.top[games] = COLORED_TOP[kinds, colors]
+        self.play_counts += np.bincount(kinds, minlength=NUM_KINDS)
+        if self.bots is not None:
+            for gi in games[seats == RANDOM_SEAT]:
+                self.bots[gi].record_discard(Card(*TOP_CARDS[self.top[gi]]))
+        self._draw(games, others, EFFECT_DRAWS[kinds])
+        self.turn[games] = np.where(EFFECT_SAME_PLAYER[kinds], seats, others)
+
+    def _pass(self, games):
+        """The player to move in each game draws one card and passes."""
+        if not len(games):
+            return
+        seats = self.turn[games]
+        if self.bots is not None:
+            for gi in games[seats == RANDOM_SEAT]:
+                bot = self.bots[gi]
+                bot.record_opponent_pass(Card(*TOP_CARDS[self.top[gi]]))
+                bot.record_opponent_draw(int(self.deck_pos[gi] < DECK_LEN))
+        self._draw(games, seats, np.ones(len(games), dtype=np.int16))
+        self.passes[games] += self.deck_pos[games] >= DECK_LEN
+        self.turn[games] = 1 - seats
+
+    # ---------------- POLICIES ---------------- #
+    def _random_moves(self, games):
+        """Vectorized random policy: (playing games, kinds, colors), stuck games."""
+        hands = self.hands[games, self.turn[games]]
+        legal = hands * PLAYABLE[self.top[games]]
+        total = legal.sum(axis=1)
+        can_play = total > 0
+        legal, total = legal[can_play], total[can_play]
+        pick = (self.rng.random(len(total)) * total).astype(np.int64)
+        kinds = (legal.cumsum(axis=1) > pick[:, None]).argmax(axis=1)
+        colors = self.rng.integers(0, len(CARD_COLORS), len(kinds))
+        return games[can_play], kinds, colors, games[~can_play]
+
+    def _ai_moves(self, games):
+        """AI_bot.choose_card for each game (one Python call per game)."""
+        played, kinds, colors, stuck = [], [], [], []
+        for g in games:
+            bot = self.bots[g]
+            chosen = bot.choose_card(bot.hand, Card(*TOP_CARDS[self.top[g]]))
+            if chosen is None:
+                stuck.append(g)
+                continue
+            colors.append(CARD_COLORS.index(bot.choose_color()))
+            bot.hand.remove(chosen)
+            bot.record_discard(chosen, by_ai=True)
+            played.append(g)
+            kinds.append(kind_id(chosen))
+        return (np.array(played, dtype=np.int64), np.array(kinds, dtype=np.int64),
+                np.array(colors, dtype=np.int64), np.array(stuck, dtype=np.int64))
+
+    # ---------------- GAME LOOP ---------------- #
+    def step(self):
+        """Advance every unfinished game by one turn; returns the number still running."""
+        games = np.flatnonzero(self.active)
+        if self.bots is not None:
+            ai_turn = self.turn[games] == AI_SEAT
+            moves = [self._random_moves(games[~ai_turn]), self._ai_moves(games[ai_turn])]
+        else:
+            moves = [self._random_moves(games)]
+        for played, kinds, colors, stuck in moves:
+            self._play(played, kinds, colors)
+            self._pass(stuck)
+        self.turns[games] += 1
+
+        sizes = self.hands[games].sum(axis=2)
+        for seat in (AI_SEAT, RANDOM_SEAT):
+            won = sizes[:, seat] == 0
+            self.winner[games[won]] = seat
+            self.active[games[won]] = False
+        self.active[games[self.passes[games] >= 2]] = False  # stalemate: winner stays DRAW
+
+        if self.bots is not None:
+            for i in np.flatnonzero(self.active[games]):
+                bot = self.bots[games[i]]
+                bot.opponent_hand_size = int(sizes[i, RANDOM_SEAT])
+                bot.deck_size = DECK_LEN - int(self.deck_pos[games[i]])
+        return int(self.active.sum())
+
+    def run(self):
+        """Play all games to the end; returns the winner array (0, 1 or DRAW)."""
+        while self.step():
+            pass
+        return self.winner
+
+    def summary(self):
+        """Seat 0 win rate with its Wilson interval plus rule statistics."""
+        games = self.n
+        wins = int((self.winner == AI_SEAT).sum())
+        low, high = wilson_interval(wins, games)
+        played = self.play_counts.sum()
+        action_share = {text: float(self.play_counts[[KIND_ID[(c, text)] for c in CARD_COLORS]].sum() / played)
+                        for text in ['skip', 'reverse', 'draw two']}
+        return {
+            'games': games,
+            'wins': wins,
+            'draws': int((self.winner == DRAW).sum()),
+            'win_rate': wins / games if games else 0.0,
+            'ci_low': low,
+            'ci_high': high,
+            'mean_turns': float(self.turns.mean()),
+            'max_turns': int(self.turns.max()),
+            'mean_cards_drawn': float(self.cards_drawn.mean()),
+            'action_share': action_share,
+        }
+
+# ---------------- RUN SIMULATION ---------------- #
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lockstep batched simulation (seat 0 vs random player).")
+    parser.add_argument('--games', type=int, default=NUM_GAMES, help="games to play")
+    parser.add_argument('--seed', type=int, default=0, help="simulation seed")
+    parser.add_argument('--difficulty', choices=['easy', 'medium', 'hard'],
+                        help="seat 0 is an AI_bot of this difficulty (default: random player)")
+    parser.add_argument('--strategy', choices=['minimax', 'ismcts'], help="AI search strategy")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    sim = BatchSimulator(args.games, args.seed, args.difficulty, args.strategy)
+    sim.run()
+    result = sim.summary()
+    seat = args.difficulty.capitalize() + " AI" if args.difficulty else "Random seat 0"
+    print(f"{seat} - Win Rate: {result['win_rate'] * 100:.2f}% "
+          f"(95% CI {result['ci_low'] * 100:.2f}-{result['ci_high'] * 100:.2f}%, "
+          f"{result['games']} games, {result['draws']} drawn) in {time.perf_counter() - start:.1f}s")
+    print(f"Turns per game: mean {result['mean_turns']:.1f}, max {result['max_turns']}; "
+          f"cards drawn per game: {result['mean_cards_drawn']:.1f}")
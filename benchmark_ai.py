@@ -0,0 +1,265 @@
+# benchmark_ai.py
+# search speed benchmark: latency, nodes/sec and memory of AI_bot.minimax_card
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from AI_uno import AI_bot
+from uno_core import Card, UnoGame, valid_cards, wild
+
+DIFFICULTIES = ['easy', 'medium', 'hard']
+CORPUS_SEED = 0
+CORPUS_SIZE = 60
+REPEAT = 5
+TOLERANCE = 0.5  # allowed relative slowdown per metric (timings vary ~30% between runs)
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+
+# position kinds of the corpus, used round-robin
+CATEGORIES = ['early', 'mid', 'late', 'wild_heavy', 'large_hand']
+
+# ---------------- POSITION CORPUS ---------------- #
+def _random_ply(game, ai, rng):
+    """Both seats play a random valid card (or draw and pass); keeps ai's tracker current."""
+    mover = game.current_player
+    playable = game.valid_cards()
+    if playable:
+        card = rng.choice(playable)
+        drawn = game.play(card, rng.choice(['red', 'yellow', 'green', 'blue']))
+        ai.record_discard(card, by_ai=mover == 'ai')
+        drawer = game.opponent(mover)
+    else:
+        drawn = game.draw(mover)
+        game.pass_turn()
+        drawer = mover
+    if drawer == 'ai':
+        for card in drawn:
+            ai.record_draw(card)
+
+def _deal_position(category, rng):
+    """Deal a game and play random moves until it matches category; None if it ended first."""
+    game = UnoGame.deal(('ai', 'player'), rng=rng)
+    hand = game.hands['ai']
+    if category == 'wild_heavy':
+        # swap three wilds from the deck into the AI's hand
+        wilds = [card for card in game.deck if card.text in wild][:3]
+        for card in wilds:
+            game.deck.remove(card)
+            game.deck.append(hand.pop(0))
+            hand.append(card)
+        rng.shuffle(game.deck)
+    elif category == 'large_hand':
+        game.draw('ai', rng.randint(5, 9))
+
+    ai = AI_bot("AI", game.deck, hand, difficulty='easy', rng=rng)  # card tracker only (no belief to feed)
+    ai.record_discard(game.current_card)
+    plies = {'early': 0, 'mid': rng.randint(8, 16)}.get(category, 0)
+    for _ in range(plies):
+        _random_ply(game, ai, rng)
+    if category == 'late':
+        while not game.is_over() and min(len(h) for h in game.hands.values()) > 3:
+            _random_ply(game, ai, rng)
+
+    # stop on an AI turn with a real choice to make
+    for _ in range(50):
+        if game.is_over():
+            return None
+        if game.current_player == 'ai' and len(valid_cards(hand, game.current_card)) >= 2:
+            break
+        _random_ply(game, ai, rng)
+    else:
+        return None
+    return {
+        'category': category,
+        'hand': [(card.color, card.text) for card in hand],
+        'current_card': (game.current_card.color, game.current_card.text),
+        'unknown_counts': list(ai.unknown_counts),
+        'opponent_hand_size': len(game.hands['player']),
+        'deck_size': len(game.deck),
+    }
+
+def build_corpus(size=CORPUS_SIZE, seed=CORPUS_SEED):
+    """Fixed list of seeded positions, cycling through CATEGORIES."""
+    corpus = []
+    attempt = 0
+    while len(corpus) < size:
+        category = CATEGORIES[len(corpus) % len(CATEGORIES)]
+        position_seed = f"bench:{seed}:{len(corpus)}:{attempt}"
+        position = _deal_position(category, random.Random(position_seed))
+        attempt += 1
+        if position is not None:
+            position['seed'] = position_seed
+            corpus.append(position)
+            attempt = 0
+    return corpus
+
+def make_bot(position, difficulty):
+    """AI_bot set up at a corpus position, with a sampling rng seeded by the position."""
+    hand = [Card(c, t) for c, t in position['hand']]
+    ai = AI_bot("AI", [], hand, difficulty=difficulty, rng=random.Random(position['seed']))
+    ai.unknown_counts = list(position['unknown_counts'])
+    ai.opponent_hand_size = position['opponent_hand_size']
+    ai.deck_size = position['deck_size']
+    ai._get_belief()  # built once per game in play, so kept out of the timed search
+    return ai, hand, Card(*position['current_card'])
+
+# ---------------- MEASUREMENT ---------------- #
+def percentile(values, q):
+    """q-th percentile (0-100) of values, linear interpolation between ranks."""
+    values = sorted(values)
+    if not values:
+        return 0.0
+    rank = (len(values) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+def bench_difficulty(corpus, difficulty, repeat=REPEAT):
+    """
+    Time minimax_card on every corpus position (best of `repeat` runs each),
+    then run each once more under tracemalloc for peak memory and retained
+    blocks (still held when the search returns, e.g. cache entries; blocks
+    freed during the search are not counted). Returns a metrics dict.
+    """
+    latencies = []
+    nodes = 0
+    search_time = 0.0
+    for position in corpus:
+        best = None
+        for _ in range(repeat):
+            ai, hand, current_card = make_bot(position, difficulty)
+            start = time.perf_counter()
+            ai.minimax_card(hand, current_card)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        latencies.append(best)
+        nodes += ai.nodes_searched
+        search_time += best
+
+    peaks = []
+    retained = []
+    retained_blocks = []
+    tracemalloc.start()
+    try:
+        for position in corpus:
+            ai, hand, current_card = make_bot(position, difficulty)
+            tracemalloc.clear_traces()
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            base_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+            ai.minimax_card(hand, current_card)
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            peaks.append(peak - base)
+            retained.append(current - base)
+            retained_blocks.append(sum(stat.count for stat in snapshot.statistics('filename')) - base_blocks)
+    finally:
+        tracemalloc.stop()
+
+    latencies_ms = [t * 1000 for t in latencies]
+    return {
+        'positions': len(corpus),
+        'nodes': nodes,
+        'nodes_per_sec': nodes / search_time if search_time else 0.0,
+        'latency_ms_p50': percentile(latencies_ms, 50),
+        'latency_ms_p95': percentile(latencies_ms, 95),
+        'latency_ms_p99': percentile(latencies_ms, 99),
+        'latency_ms_max': max(latencies_ms),
+        'peak_kb_p50': percentile(peaks, 50) / 1024,
+        'peak_kb_max': max(peaks) / 1024,
+        'retained_kb_max': max(retained) / 1024,
+        'retained_blocks_p50': percentile(retained_blocks, 50),
+        'retained_blocks_max': max(retained_blocks),
+    }
+
+def run_benchmark(difficulties=DIFFICULTIES, size=CORPUS_SIZE, seed=CORPUS_SEED, repeat=REPEAT):
+    """Benchmark every difficulty on one corpus; returns a JSON-ready dict."""
+    corpus = build_corpus(size, seed)
+    return {
+        'corpus': {'size': size, 'seed': seed,
+                   'categories': {c: sum(p['category'] == c for p in corpus) for c in CATEGORIES}},
+        'machine': {'python': platform.python_version(), 'platform': platform.platform()},
+        'results': {difficulty: bench_difficulty(corpus, difficulty, repeat) for difficulty in difficulties},
+    }
+
+# ---------------- BASELINE COMPARISON ---------------- #
+# metric -> True when higher is better
+COMPARED_METRICS = {
+    'nodes': False,
+    'nodes_per_sec': True,
+    'latency_ms_p50': False,
+    'latency_ms_p95': False,
+    'latency_ms_p99': False,
+    'peak_kb_max': False,
+    'retained_blocks_max': False,
+}
+
+def compare(report, baseline, tolerance=TOLERANCE):
+    """
+    Compare a report with a baseline report of the same corpus.
+    Returns a list of (difficulty, metric, baseline value, new value, regressed).
+    """
+    rows = []
+    for difficulty, metrics in report['results'].items():
+        old_metrics = baseline.get('results', {}).get(difficulty)
+        if old_metrics is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = old_metrics.get(metric), metrics.get(metric)
+            if old is None or new is None or old == 0:
+                continue
+            change = (new - old) / old
+            regressed = change < -tolerance if higher_is_better else change > tolerance
+            rows.append((difficulty, metric, old, new, regressed))
+    return rows
+
+# ---------------- RUN BENCHMARK ---------------- #
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark minimax_card on a fixed position corpus.")
+    parser.add_argument('--difficulty', choices=DIFFICULTIES, action='append',
+                        help="difficulty to run (repeatable, default: all)")
+    parser.add_argument('--positions', type=int, default=CORPUS_SIZE, help="corpus size")
+    parser.add_argument('--seed', type=int, default=CORPUS_SEED, help="corpus seed")
+    parser.add_argument('--repeat', type=int, default=REPEAT, help="timed runs per position (best is kept)")
+    parser.add_argument('--output', help="write the JSON report to this file")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="baseline JSON to compare against")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help="allowed relative regression per metric (0.5 = 50%%)")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="overwrite the baseline with this run (when node or memory counts change; "
+                             "timings alone are noise)")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.difficulty or DIFFICULTIES, args.positions, args.seed, args.repeat)
+    for difficulty, m in report['results'].items():
+        print(f"Difficulty: {difficulty.capitalize()} - p50 {m['latency_ms_p50']:.1f} ms, "
+              f"p95 {m['latency_ms_p95']:.1f} ms, p99 {m['latency_ms_p99']:.1f} ms, "
+              f"{m['nodes_per_sec']:.0f} nodes/s, peak {m['peak_kb_max']:.0f} KB, "
+              f"{m['retained_blocks_max']} retained blocks")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        sys.exit(0)
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        sys.exit(0)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get('corpus', {}).get('size') != args.positions or baseline['corpus'].get('seed') != args.seed:
+        print("Baseline was recorded on a different corpus; not comparing")
+        sys.exit(0)
+    regressions = 0
+    for difficulty, metric, old, new, regressed in compare(report, baseline, args.tolerance):
+        mark = "REGRESSION" if regressed else "ok"
+        print(f"  {difficulty:<6} {metric:<19} {old:>12.1f} -> {new:>12.1f}  {mark}")
+        regressions += regressed
+    sys.exit(1 if regressions else 0)
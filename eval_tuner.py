@@ -0,0 +1,173 @@
+# eval_tuner.py
+# offline tuning of the AI_bot evaluation weights on self-play data
+import argparse
+import glob
+import json
+import os
+import time
+import numpy as np
+from AI_uno import DEFAULT_EVAL_WEIGHTS, EVAL_FEATURES, eval_weight_tuple, evaluation_features
+from ai_performance_test import run_tournament
+from selfplay_dataset import load_shard
+
+GENERATIONS = 30
+POPULATION = 64
+ELITE_FRACTION = 0.2   # share of each CEM generation the next one is fitted to
+FINALISTS = 3
+CONFIRM_GAMES = 400
+CHUNK_ROWS = 200000    # positions scored per matrix product (bounds memory)
+
+# ---------------- DATASET ---------------- #
+def load_positions(data):
+    """
+    Feature matrix and targets of every self-play position under data (a
+    shard file or a directory of shards). Features are evaluation_features
+    from the deciding player's side; targets are 1 win, 0.5 draw, 0 loss.
+    """
+    paths = sorted(glob.glob(os.path.join(data, '*.bin'))) if os.path.isdir(data) else [data]
+    if not paths:
+        raise ValueError(f"no self-play shards in {data}")
+    features, targets = [], []
+    for path in paths:
+        shard = load_shard(path)
+        for start in range(0, len(shard), CHUNK_ROWS):
+            rows = shard[start:start + CHUNK_ROWS]
+            features.append(evaluation_features(rows['hand'].astype(np.int64), rows['opp_hand'].astype(np.int64),
+                                                rows['top'].astype(np.int64)))
+            targets.append((rows['outcome'].astype(np.float64) + 1) / 2)
+        del shard
+    return np.concatenate(features), np.concatenate(targets)
+
+# ---------------- OBJECTIVE ---------------- #
+def population_loss(features, targets, population, k):
+    """
+    Mean squared error between sigmoid(k * eval) and the game outcome for
+    every weight vector of population (P, n_features), all in one pass:
+    the evals of the whole population are a single features @ population.T.
+    """
+    loss = np.zeros(len(population))
+    for start in range(0, len(features), CHUNK_ROWS):
+        evals = features[start:start + CHUNK_ROWS] @ population.T
+        predicted = 1 / (1 + np.exp(-k * evals))
+        loss += ((predicted - targets[start:start + CHUNK_ROWS, None]) ** 2).sum(axis=0)
+    return loss / len(features)
+
+def fit_scale(features, targets, weights):
+    """The k that best maps weights' evals to win probability (golden-section search on log k)."""
+    weights = np.asarray([weights], dtype=np.float64)
+    low, high = np.log(1e-6), np.log(1.0)
+    ratio = (np.sqrt(5) - 1) / 2
+    for _ in range(60):
+        a = high - ratio * (high - low)
+        b = low + ratio * (high - low)
+        if population_loss(features, targets, weights, np.exp(a))[0] < \
+                population_loss(features, targets, weights, np.exp(b))[0]:
+            high = b
+        else:
+            low = a
+    return float(np.exp((low + high) / 2))
+
+# ---------------- OPTIMIZERS ---------------- #
+def cem(features, targets, k, start, generations=GENERATIONS, population=POPULATION, rng=None):
+    """
+    Cross-entropy method: sample a population around a Gaussian, refit the
+    Gaussian to the best ELITE_FRACTION. Returns the last population sorted
+    by loss and its losses.
+    """
+    rng = rng or np.random.default_rng(0)
+    mean = np.asarray(start, dtype=np.float64)
+    std = np.maximum(np.abs(mean) * 0.5, 10.0)
+    elite = max(2, int(population * ELITE_FRACTION))
+    for generation in range(generations):
+        candidates = rng.normal(mean, std, (population, len(mean)))
+        candidates[0] = mean  # keep the current mean in the running
+        loss = population_loss(features, targets, candidates, k)
+        order = np.argsort(loss)
+        mean = candidates[order[:elite]].mean(axis=0)
+        std = candidates[order[:elite]].std(axis=0) + 1.0
+        print(f"generation {generation + 1}: best loss {loss[order[0]]:.6f}")
+    return candidates[order], loss[order]
+
+def random_search(features, targets, k, start, generations=GENERATIONS, population=POPULATION, rng=None):
+    """
+    Random local search: each generation perturbs the best weights so far,
+    with a step that shrinks as generations pass. Returns every candidate
+    sorted by loss and its losses.
+    """
+    rng = rng or np.random.default_rng(0)
+    best = np.asarray(start, dtype=np.float64)
+    scale = np.maximum(np.abs(best) * 0.5, 10.0)
+    seen, seen_loss = [best[None]], [population_loss(features, targets, best[None], k)]
+    best_loss = seen_loss[0][0]
+    for generation in range(generations):
+        step = scale * (1 - generation / generations)
+        candidates = best + rng.normal(0, 1, (population, len(best))) * step
+        loss = population_loss(features, targets, candidates, k)
+        seen.append(candidates)
+        seen_loss.append(loss)
+        if loss.min() < best_loss:
+            best, best_loss = candidates[loss.argmin()], loss.min()
+        print(f"generation {generation + 1}: best loss {best_loss:.6f}")
+    candidates, loss = np.concatenate(seen), np.concatenate(seen_loss)
+    order = np.argsort(loss)
+    return candidates[order], loss[order]
+
+OPTIMIZERS = {'cem': cem, 'random': random_search}
+
+# ---------------- CONFIRMATION ---------------- #
+def profile(weights):
+    """Weight vector -> AI_bot eval_weights profile."""
+    return {name: round(float(w), 2) for name, w in zip(EVAL_FEATURES, weights)}
+
+def confirm(finalists, difficulty, games, workers=None, base_seed=0):
+    """
+    Play every finalist profile against the random player in the same seeded
+    games (parallel tournament). Returns [(profile, tournament result)] best first.
+    """
+    results = []
+    for weights in finalists:
+        result = run_tournament(difficulty, games, workers, base_seed, eval_weights=weights)
+        print(f"  {weights} - Win Rate: {result['win_rate'] * 100:.2f}% "
+              f"(95% CI {result['ci_low'] * 100:.2f}-{result['ci_high'] * 100:.2f}%)")
+        results.append((weights, result))
+    return sorted(results, key=lambda item: item[1]['win_rate'], reverse=True)
+
+# ---------------- RUN TUNING ---------------- #
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tune AI_bot evaluation weights on self-play data.")
+    parser.add_argument('--data', default='selfplay_data', help="self-play shard or directory of shards")
+    parser.add_argument('--optimizer', choices=sorted(OPTIMIZERS), default='cem')
+    parser.add_argument('--generations', type=int, default=GENERATIONS)
+    parser.add_argument('--population', type=int, default=POPULATION, help="weight vectors per generation")
+    parser.add_argument('--seed', type=int, default=0, help="optimizer and confirmation seed")
+    parser.add_argument('--finalists', type=int, default=FINALISTS, help="best profiles confirmed in games")
+    parser.add_argument('--games', type=int, default=CONFIRM_GAMES, help="confirmation games per finalist")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--difficulty', choices=['easy', 'medium', 'hard'], default='medium',
+                        help="AI difficulty of the confirmation games")
+    parser.add_argument('--output', default='eval_weights.json', help="where to write the best profile")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    features, targets = load_positions(args.data)
+    default = np.array(eval_weight_tuple(DEFAULT_EVAL_WEIGHTS), dtype=np.float64)
+    k = fit_scale(features, targets, default)
+    default_loss = population_loss(features, targets, default[None], k)[0]
+    print(f"{len(features)} positions, k = {k:.5f}, default loss {default_loss:.6f}")
+
+    candidates, loss = OPTIMIZERS[args.optimizer](features, targets, k, default, args.generations,
+                                                  args.population, np.random.default_rng(args.seed))
+    finalists = [profile(default)]
+    for weights in candidates:
+        if len(finalists) > args.finalists:
+            break
+        if profile(weights) not in finalists:
+            finalists.append(profile(weights))
+    print(f"Tuned in {time.perf_counter() - start:.1f}s; confirming {len(finalists) - 1} finalists "
+          f"and the default weights over {args.games} games")
+
+    ranked = confirm(finalists, args.difficulty, args.games, args.workers, args.seed)
+    best, result = ranked[0]
+    with open(args.output, 'w') as f:
+        json.dump(best, f, indent=2)
+    print(f"Best profile {best} ({result['win_rate'] * 100:.2f}%) written to {args.output}")
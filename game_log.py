@@ -0,0 +1,212 @@
+# game_log.py
+# compact binary game log: fixed-width move records, streaming writer, memory-mapped reader
+import mmap
+import os
+import struct
+from uno_core import CARD_COLORS, KIND_CARDS, color, kind_id
+
+try:
+    import numpy as np  # optional: only needed for GameLogReader.array()
+except ImportError:
+    np = None
+
+# ---------------- FORMAT ---------------- #
+# File: 16-byte header (magic, version, record size), then 16-byte records.
+# A game's records are written together, in order: DEAL x hand sizes, START,
+# then one record per action, then END. Games are delimited by their END
+# record; ids are the caller's (tournament game index, client timestamp) and
+# need not be unique across a log.
+MAGIC = b'UNOLOG\x00\x00'
+VERSION = 1
+HEADER = struct.Struct('<8sII')
+RECORD = struct.Struct('<IHBBBBB4Bx')  # game, turn, type, player, card, color, n_drawn, drawn[4]
+
+# record types
+DEAL, START, PLAY, DRAW, PASS, END = range(6)
+RECORD_TYPES = ['deal', 'start', 'play', 'draw', 'pass', 'end']
+
+NONE = 255        # empty card / color / player field (player NONE in END = stalemate)
+MAX_DRAWN = 4     # drawn card slots per record; longer draws continue in extra DRAW records
+
+if np is not None:
+    RECORD_DTYPE = np.dtype([('game', '<u4'), ('turn', '<u2'), ('type', 'u1'), ('player', 'u1'),
+                             ('card', 'u1'), ('color', 'u1'), ('n_drawn', 'u1'), ('drawn', 'u1', MAX_DRAWN),
+                             ('pad', 'u1')])
+    assert RECORD_DTYPE.itemsize == RECORD.size
+
+
+def color_index(card_color):
+    """Color field of a card color name (NONE for wild gray or anything else)."""
+    return CARD_COLORS.index(card_color) if card_color in color else NONE
+
+# ---------------- WRITING ---------------- #
+class GameRecorder:
+    """
+    Records one game as packed bytes. players are the seat names used by the
+    caller (e.g. ('ai', 'player')); records store their index.
+    """
+    def __init__(self, game_id, players=('ai', 'player')):
+        self.game_id = game_id
+        self.players = list(players)
+        self.turn = 0
+        self.buffer = bytearray()
+
+    def _add(self, record_type, player=None, card=None, card_color=NONE, drawn=()):
+        """Append one record (and follow-up DRAW records if more than MAX_DRAWN cards)."""
+        seat = NONE if player is None else self.players.index(player)
+        card_id = NONE if card is None else kind_id(card)
+        drawn = [kind_id(c) for c in drawn]
+        first, rest = drawn[:MAX_DRAWN], drawn[MAX_DRAWN:]
+        self.buffer += RECORD.pack(self.game_id, self.turn, record_type, seat, card_id, card_color,
+                                   len(first), *(first + [NONE] * (MAX_DRAWN - len(first))))
+        while rest:
+            chunk, rest = rest[:MAX_DRAWN], rest[MAX_DRAWN:]
+            self.buffer += RECORD.pack(self.game_id, self.turn, DRAW, seat, NONE, NONE,
+                                       len(chunk), *(chunk + [NONE] * (MAX_DRAWN - len(chunk))))
+
+    def deal(self, player, hand):
+        """Starting hand of a player."""
+        for card in hand:
+            self._add(DEAL, player, card)
+
+    def start(self, card):
+        """Card turned up to start the discard pile."""
+        self._add(START, card=card, card_color=color_index(card.color))
+
+    def play(self, player, card, drawn=()):
+        """player plays card (wilds: card.color is the chosen color); drawn = cards the opponent drew."""
+        self._add(PLAY, player, card, color_index(card.color), drawn)
+        self.turn += 1
+
+    def draw(self, player, drawn):
+        """player drew cards from the deck on their own turn."""
+        self._add(DRAW, player, drawn=drawn)
+
+    def pass_turn(self, player):
+        """player ended their turn without playing."""
+        self._add(PASS, player)
+        self.turn += 1
+
+    def end(self, winner):
+        """Game over: winner is a player name, or 'draw'/None for a stalemate."""
+        self._add(END, winner if winner in self.players else None)
+
+    def to_bytes(self):
+        return bytes(self.buffer)
+
+
+class GameLogWriter:
+    """Streams finished games to a log file (appends to an existing log)."""
+    def __init__(self, path):
+        self.path = path
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if exists:
+            with open(path, 'rb') as f:
+                _check_header(f.read(HEADER.size))
+        self.file = open(path, 'ab')
+        if not exists:
+            self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        self.games = 0
+
+    def write_game(self, game):
+        """Write a GameRecorder (or its to_bytes()) to the log."""
+        self.file.write(game.to_bytes() if isinstance(game, GameRecorder) else game)
+        self.games += 1
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _check_header(data):
+    """Raise ValueError unless data is a header this module can read."""
+    if len(data) < HEADER.size:
+        raise ValueError("not a game log: file too short")
+    magic, version, record_size = HEADER.unpack(data[:HEADER.size])
+    if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+        raise ValueError(f"not a version {VERSION} game log")
+
+# ---------------- READING ---------------- #
+class GameLogReader:
+    """
+    Memory-mapped view of a log file. Nothing is read into Python objects up
+    front: records() decodes lazily and array() is a zero-copy NumPy view.
+    """
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        _check_header(self.map[:HEADER.size])
+        self.num_records = (len(self.map) - HEADER.size) // RECORD.size
+
+    def __len__(self):
+        return self.num_records
+
+    def record(self, i):
+        """The i-th record as a tuple (game, turn, type, player, card, color, n_drawn, *drawn)."""
+        return RECORD.unpack_from(self.map, HEADER.size + i * RECORD.size)
+
+    def records(self, start=0, stop=None):
+        """Iterate over record tuples lazily."""
+        stop = self.num_records if stop is None else min(stop, self.num_records)
+        view = memoryview(self.map)[HEADER.size + start * RECORD.size:HEADER.size + stop * RECORD.size]
+        try:
+            yield from RECORD.iter_unpack(view)
+        finally:
+            view.release()
+
+    def games(self):
+        """Yield (game id, first record index, end index) for each game in the log."""
+        if np is not None:
+            records = self.array()
+            ends = np.flatnonzero(records['type'] == END) + 1
+            starts = np.concatenate(([0], ends[:-1]))
+            game_ids = records['game'][ends - 1]
+            del records
+            yield from zip(game_ids.tolist(), starts.tolist(), ends.tolist())
+            return
+        start = 0
+        for i, rec in enumerate(self.records()):
+            if rec[2] == END:
+                yield rec[0], start, i + 1
+                start = i + 1
+
+    def array(self):
+        """
+        All records as a read-only NumPy structured array backed by the mapping
+        (needs numpy). Drop the array before close(), the mapping cannot close under it.
+        """
+        if np is None:
+            raise ImportError("GameLogReader.array requires numpy")
+        return np.frombuffer(self.map, dtype=RECORD_DTYPE, count=self.num_records, offset=HEADER.size)
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def describe_record(rec):
+    """Readable one-line form of a record tuple, for debugging."""
+    game, turn, record_type, player, card, card_color, n_drawn = rec[:7]
+    text = f"game {game} turn {turn} {RECORD_TYPES[record_type]}"
+    if player != NONE:
+        text += f" p{player}"
+    if card != NONE:
+        c, t = KIND_CARDS[card]
+        text += f" {CARD_COLORS[card_color] if card_color != NONE else c} {t}"
+    if n_drawn:
+        text += " drew " + ", ".join(" ".join(KIND_CARDS[k]) for k in rec[7:7 + n_drawn])
+    return text
@@ -0,0 +1,231 @@
+# ismcts_uno.py
+# information-set Monte Carlo tree search (ISMCTS) strategy for AI_bot
+import math
+import random
+import time
+from uno_core import (CARD_COLORS, CARD_TEXTS, NUM_KINDS, KIND_CARDS, KIND_ID, TOP_ID, WILD_TEXTS,
+                      PLAYABLE_MASK, card_effect, hand_mask, mask_kinds)
+
+DRAW = -1               # tree action: no legal card, draw one and pass
+AI, OPPONENT = 0, 1     # seats in a determinization
+MAX_ROLLOUT_PLIES = 300  # rollouts longer than this are scored by hand size
+EXPLORATION = 0.7       # UCB1 exploration constant
+
+# ---------------- KIND TABLES ---------------- #
+KIND_EFFECT = [card_effect(text) for _, text in KIND_CARDS]
+# top id after playing a wild kind and choosing color index c
+WILD_TOP = [[TOP_ID[(c, text)] for c in CARD_COLORS] if text in WILD_TEXTS else None
+            for _, text in KIND_CARDS]
+# kind ids of each color, to pick a wild color from a count vector
+COLOR_KINDS = [[KIND_ID[(c, t)] for t in CARD_TEXTS] for c in CARD_COLORS]
+
+
+def best_color_index(counts):
+    """Color the holder has most cards of (ties: first color), as AI_bot.choose_color."""
+    best, best_n = 0, -1
+    for i, kinds in enumerate(COLOR_KINDS):
+        n = 0
+        for k in kinds:
+            n += counts[k]
+        if n > best_n:
+            best, best_n = i, n
+    return best
+
+# ---------------- DETERMINIZED GAME ---------------- #
+class Determinization:
+    """
+    One fully specified version of the game (opponent hand and deck order
+    sampled), played with the uno_core rules on count vectors.
+    """
+    __slots__ = ('counts', 'masks', 'sizes', 'pool', 'deck_size', 'top', 'to_move', 'passes', 'rng')
+
+    def __init__(self, ai_counts, opp_counts, pool, deck_size, top, rng, to_move=AI):
+        """
+        pool: kind ids of the unseen cards not in either hand; the deck is
+        deck_size of them, and each draw takes a uniformly random one, which is
+        the same as shuffling the deck up front.
+        """
+        self.counts = [ai_counts, opp_counts]
+        self.masks = [hand_mask(ai_counts), hand_mask(opp_counts)]
+        self.sizes = [sum(ai_counts), sum(opp_counts)]
+        self.pool = pool
+        self.deck_size = min(deck_size, len(pool))
+        self.top = top
+        self.to_move = to_move
+        self.passes = 0
+        self.rng = rng
+
+    @classmethod
+    def sample(cls, ai_counts, unknown_pool, opp_hand_size, deck_size, top, rng):
+        """Deal a random opponent hand from the unknown cards (a list of kind ids)."""
+        pool = list(unknown_pool)
+        opp_counts = [0] * NUM_KINDS
+        for _ in range(min(opp_hand_size, len(pool))):
+            opp_counts[cls._take(pool, rng)] += 1
+        return cls(list(ai_counts), opp_counts, pool, deck_size, top, rng)
+
+    @staticmethod
+    def _take(pool, rng):
+        """Remove and return a uniformly random element of pool."""
+        i = rng.randrange(len(pool))
+        pool[i], pool[-1] = pool[-1], pool[i]
+        return pool.pop()
+
+    def winner(self):
+        """AI, OPPONENT, 'draw' on a stalemate, or None while the game goes on."""
+        if self.sizes[AI] == 0:
+            return AI
+        if self.sizes[OPPONENT] == 0:
+            return OPPONENT
+        if self.passes >= 2:
+            return 'draw'
+        return None
+
+    def legal_moves(self):
+        """Distinct legal kinds of the player to move, or [DRAW] if there are none."""
+        legal = self.masks[self.to_move] & PLAYABLE_MASK[self.top]
+        return mask_kinds(legal) if legal else [DRAW]
+
+    def _draw(self, seat, n):
+        counts = self.counts[seat]
+        for _ in range(n):
+            if not self.deck_size:
+                break
+            self.deck_size -= 1
+            k = self._take(self.pool, self.rng)
+            if counts[k] == 0:
+                self.masks[seat] |= 1 << k
+            counts[k] += 1
+            self.sizes[seat] += 1
+
+    def apply(self, move):
+        """Play a kind (resolving its effect) or DRAW one card and pass."""
+        seat = self.to_move
+        other = 1 - seat
+        if move == DRAW:
+            if not self.deck_size:
+                self.passes += 1
+            self._draw(seat, 1)
+            self.to_move = other
+            return
+        counts = self.counts[seat]
+        counts[move] -= 1
+        if counts[move] == 0:
+            self.masks[seat] ^= 1 << move
+        self.sizes[seat] -= 1
+        self.passes = 0
+
+        draws, same_player, choose_color = KIND_EFFECT[move]
+        self.top = WILD_TOP[move][best_color_index(counts)] if choose_color else move
+        if draws:
+            self._draw(other, draws)
+        if not same_player:
+            self.to_move = other
+
+    def rollout(self):
+        """Finish the game with random legal moves; returns the AI's reward."""
+        plies = 0
+        while self.winner() is None and plies < MAX_ROLLOUT_PLIES:
+            legal = self.masks[self.to_move] & PLAYABLE_MASK[self.top]
+            self.apply(self._random_card(legal) if legal else DRAW)
+            plies += 1
+        return self.reward()
+
+    def _random_card(self, legal):
+        """Uniformly random legal card (like RandomPlayer), so kinds weigh by count."""
+        counts = self.counts[self.to_move]
+        kinds = mask_kinds(legal)
+        if len(kinds) == 1:
+            return kinds[0]
+        r = self.rng.randrange(sum(counts[k] for k in kinds))
+        for k in kinds:
+            r -= counts[k]
+            if r < 0:
+                return k
+        return kinds[-1]
+
+    def reward(self):
+        """1 for an AI win, 0 for a loss, 0.5 for a draw or an unfinished even game."""
+        winner = self.winner()
+        if winner == AI:
+            return 1.0
+        if winner == OPPONENT:
+            return 0.0
+        if winner is None and self.sizes[AI] != self.sizes[OPPONENT]:
+            return 1.0 if self.sizes[AI] < self.sizes[OPPONENT] else 0.0
+        return 0.5
+
+# ---------------- SEARCH TREE ---------------- #
+class Node:
+    """Information-set tree node reached by `move` made by `player`."""
+    __slots__ = ('move', 'parent', 'player', 'children', 'visits', 'wins', 'avail')
+
+    def __init__(self, move=None, parent=None, player=None):
+        self.move = move
+        self.parent = parent
+        self.player = player
+        self.children = {}
+        self.visits = 0
+        self.wins = 0.0   # rewards from the point of view of `player`
+        self.avail = 1    # times this move was legal when its parent was visited
+
+    def ucb_child(self, legal, exploration):
+        """Pick the legal child with the best UCB1 score (availability-based)."""
+        best, best_score = None, float('-inf')
+        for move in legal:
+            child = self.children[move]
+            score = child.wins / child.visits + exploration * math.sqrt(math.log(child.avail) / child.visits)
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
+
+def ismcts_search(ai_counts, unknown_counts, opp_hand_size, deck_size, top,
+                  playouts=1000, time_budget=None, rng=random, exploration=EXPLORATION,
+                  cancel_event=None):
+    """
+    Run single-observer ISMCTS from the AI's information set: every iteration
+    samples a new determinization and walks the one shared tree with the
+    moves legal in it. Stops after `playouts` iterations or `time_budget`
+    seconds, whichever comes first, or as soon as cancel_event (a
+    threading.Event) is set. Returns (best kind, {kind: visits}).
+    """
+    root = Node()
+    unknown_pool = [k for k in range(NUM_KINDS) for _ in range(unknown_counts[k])]
+    deadline = time.perf_counter() + time_budget if time_budget is not None else None
+    for iteration in range(playouts):
+        if deadline is not None and iteration and time.perf_counter() >= deadline:
+            break
+        if cancel_event is not None and cancel_event.is_set():
+            break
+        state = Determinization.sample(ai_counts, unknown_pool, opp_hand_size, deck_size, top, rng)
+        node = root
+
+        # selection / expansion
+        while state.winner() is None:
+            legal = state.legal_moves()
+            untried = [m for m in legal if m not in node.children]
+            for m in legal:
+                if m in node.children:
+                    node.children[m].avail += 1
+            if untried:
+                move = rng.choice(untried)
+                child = Node(move, node, state.to_move)
+                node.children[move] = child
+                state.apply(move)
+                node = child
+                break
+            node = node.ucb_child(legal, exploration)
+            state.apply(node.move)
+
+        # simulation and backpropagation
+        reward = state.rollout()
+        while node is not root:
+            node.visits += 1
+            node.wins += reward if node.player == AI else 1.0 - reward
+            node = node.parent
+        root.visits += 1
+
+    visits = {move: child.visits for move, child in root.children.items()}
+    best = max(visits, key=visits.get) if visits else None
+    return best, visits
@@ -1,15 +1,26 @@
 # main_game.py
+import os
 import random
+import threading
+import time
 import tkinter as tk
 from tkinter import messagebox, simpledialog
 from tkinter import font as tkfont
-from AI_uno import AI_bot
+from AI_uno import AI_bot, SearchCancelled
+import uno_core
+from uno_core import color, number, card_effect
+from game_log import GameLogWriter, GameRecorder
 
 # global variables
 window = None          # main Tkinter window
 game_manager = None    # instance of GameManager to control game flow
 current_card = None    # currently active card on discard pile
 ai_hand_label = None   # label displaying AI's hand size
+ai_thinking_label = None  # "AI is thinking..." indicator shown during searches
+AI_POLL_MS = 30        # how often the UI checks whether the AI search finished
+AI_PONDER = True       # let the AI search its replies while the human is thinking
+# finished games are appended here, next to this file (None disables logging)
+GAME_LOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uno_games.log')
 
 # ---------------- TITLE SCREEN ---------------- #
 def show_title_screen(root, start_game_callback):
@@ -44,19 +55,12 @@ def start_uno_game(root, difficulty):
         widget.destroy()
     initialize_game_ui(difficulty)
 
-# ---------------- GAME SETTINGS ---------------- #
-color = ['red', 'yellow', 'green', 'blue']  # available colors
-number = ['0', '1', '1', '2', '2', '3', '3', '4', '4', '5', '5',
-          '6', '6', '7', '7', '8', '8', '9', '9']  # number cards
-action = ['skip', 'reverse', 'draw two']  # action cards
-wild = ['wild', 'wild draw four']        # wild cards
-
 # ---------------- CARD CLASS ---------------- #
-class Card:
+# game settings (color, number, action, wild) and rules live in uno_core
+class Card(uno_core.Card):
     """Represents an Uno card and handles its UI interactions."""
     def __init__(self, color, text):
-        self.color = color
-        self.text = text
+        super().__init__(color, text)
         self.is_played = False
         self.widget = None
         self.x = 0
@@ -101,16 +105,18 @@ class Card:
             return
 
         if self.is_inside_discard() and game_manager.is_card_valid(self):
+            game_manager.stop_pondering()  # the AI's state is about to change
             self.is_played = True
             if self in game_manager.human.hand: game_manager.human.hand.remove(self)
             game_manager.discard_pile.add_card(self)
-            game_manager.AI.discard_history.append(self)
+            game_manager.AI.record_discard(self)
             game_manager.AI.opponent_hand_size = len(game_manager.human.hand)
             game_manager.AI.deck_size = len(game_manager.deck)
             game_manager.human.turn = False
             game_manager.human.card_button.place_forget()
 
             if len(game_manager.human.hand) == 0:
+                game_manager.finish_game('human', self)
                 messagebox.showinfo("Game Over", "You Win!")
                 window.quit()
                 return
@@ -156,10 +162,15 @@ class Player:
         """Allow player to draw a card from the deck manually."""
         if not self.turn: return
         if self.deck:
+            game_manager.stop_pondering()  # the AI's state is about to change
             drawn = self.deck.pop()
             self.hand.append(drawn)
             drawn.create_widget()
             layout_player_hand(self)
+            game_manager.AI.record_opponent_draw()
+            game_manager.AI.opponent_hand_size = len(self.hand)
+            game_manager.AI.deck_size = len(self.deck)
+            game_manager.record(lambda r: r.draw('human', [drawn]))
 
         # Check if player can play any card after drawing
         playable = any(game_manager.is_card_valid(c) for c in self.hand)
@@ -170,6 +181,9 @@ class Player:
         """End the player's turn after drawing if no playable cards."""
         self.turn = False
         self.card_button.place_forget()
+        game_manager.stop_pondering()
+        game_manager.AI.record_opponent_pass(current_card)
+        game_manager.record(lambda r: r.pass_turn('human'))
         game_manager.switch_player()
         window.after(200, game_manager.turns)
 
@@ -180,6 +194,8 @@ class Player:
             self.hand.append(drawn)
             drawn.create_widget()
             layout_player_hand(self)
+            return drawn
+        return None
 
     def say_UNO(self):
         """Display a message when the player calls UNO."""
@@ -206,16 +222,67 @@ class Discard_Pile:
         card.widget.tkraise()
         self.cards.append(card)
 
+# ---------------- AI SEARCH WORKER ---------------- #
+class AISearchWorker:
+    """Runs AI_bot searches on a background thread so the tkinter loop keeps running."""
+    def __init__(self, ai):
+        self.ai = ai
+        self.cancel_event = threading.Event()
+        ai.cancel_event = self.cancel_event  # the search polls it with its budget
+        self.thread = None
+        self.result = None
+        self.error = None
+
+    def start(self, search, *args):
+        """Run search(*args) (e.g. ai.choose_card); poll is_running() and read result afterwards."""
+        self.cancel()
+        self.cancel_event.clear()
+        self.result = None
+        self.error = None
+        self.thread = threading.Thread(target=self._run, args=(search, args), daemon=True)
+        self.thread.start()
+
+    def _run(self, search, args):
+        try:
+            self.result = search(*args)
+        except SearchCancelled:
+            pass
+        except Exception as error:  # re-raised on the tkinter thread by raise_error
+            self.error = error
+
+    def raise_error(self):
+        """Re-raise (once) an exception from the last search on the calling thread."""
+        error, self.error = self.error, None
+        if error is not None:
+            raise error
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def cancel(self):
+        """
+        Abort a running search and wait for its thread to exit, so the caller
+        can change the AI's state (searches poll cancel_event every few dozen nodes).
+        An exception the search raised is re-raised here before it can be lost.
+        """
+        self.cancel_event.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.raise_error()
+
 # ---------------- GAME MANAGER ---------------- #
 class GameManager:
     """Controls game flow, player turns, and game rules."""
-    def __init__(self, human, AI, deck):
+    def __init__(self, human, AI, deck, recorder=None):
         self.human = human
         self.AI = AI
         self.deck = deck
+        self.recorder = recorder  # game_log.GameRecorder of this game, if logging
         self.current_player = 'AI'
         self.discard_pile = Discard_Pile()
         self.locked = False  # prevents overlapping AI/human turns
+        self.game_over = False
+        self.ai_worker = AISearchWorker(AI)
 
     def start(self):
         """Start the game loop."""
@@ -227,20 +294,63 @@ class GameManager:
         if self.locked: return
         if self.current_player == 'human':
             self.human.start_turn()
+            if AI_PONDER and not self.game_over:
+                self.ai_worker.start(self.AI.ponder, current_card)
         else:
             self.locked = True
             window.after(50, self._ai_make_move)
 
+    def stop_pondering(self):
+        """Stop the AI's ponder search (if any) so its state can be changed safely."""
+        self.ai_worker.cancel()
+
+    def stop(self):
+        """End the game: cancel any running AI search and ignore its result."""
+        self.game_over = True
+        self.ai_worker.cancel()
+
+    def record(self, log_event):
+        """Call log_event(recorder) when this game is being logged."""
+        if self.recorder is not None:
+            log_event(self.recorder)
+
+    def finish_game(self, winner, last_card):
+        """Log the winning card and the result to GAME_LOG_PATH, then stop the game."""
+        if self.recorder is not None and GAME_LOG_PATH:
+            self.recorder.play(winner, last_card)
+            self.recorder.end(winner)
+            with GameLogWriter(GAME_LOG_PATH) as log:
+                log.write_game(self.recorder)
+        self.stop()
+
     def _ai_make_move(self):
-        """AI selects a card to play or draws if no playable cards."""
+        """Start the AI search on the worker thread and poll for its result."""
         global current_card
+        if self.game_over: return
         self.AI.is_AI_turn = True
-        chosen = self.AI.choose_card(self.AI.hand, current_card)
+        show_ai_thinking(True)
+        self.ai_worker.start(self.AI.choose_card, list(self.AI.hand), current_card)
+        window.after(AI_POLL_MS, self._poll_ai_move)
+
+    def _poll_ai_move(self):
+        """Check the AI worker from the tkinter loop; play its move once it is done."""
+        if self.game_over: return
+        if self.ai_worker.is_running():
+            window.after(AI_POLL_MS, self._poll_ai_move)
+            return
+        show_ai_thinking(False)
+        self.ai_worker.raise_error()
+        self._play_ai_move(self.ai_worker.result)
+
+    def _play_ai_move(self, chosen):
+        """AI plays the chosen card, or draws if it had no playable cards."""
+        global current_card
         if chosen is None:
             if self.deck:
-                drawn = self.deck.pop()
-                self.AI.hand.append(drawn)
+                drawn = self.AI.draw_card_silent(self.deck)
                 update_ai_hand_label(self)
+                self.record(lambda r: r.draw('AI', [drawn]))
+            self.record(lambda r: r.pass_turn('AI'))
             self.AI.is_AI_turn = False
             self.locked = False
             self.switch_player()
@@ -254,10 +364,11 @@ class GameManager:
 
         self.AI.opponent_hand_size = len(self.human.hand)
         self.AI.deck_size = len(self.deck)
-        self.AI.discard_history.append(chosen)
+        self.AI.record_discard(chosen, by_ai=True)
         update_ai_hand_label(self)
 
         if len(self.AI.hand) == 0:
+            self.finish_game('AI', chosen)
             messagebox.showinfo("Game Over", "AI Wins!")
             window.quit()
             return
@@ -268,18 +379,19 @@ class GameManager:
         window.after(200, self.turns)
 
     def end_turn(self, played_card):
-        """Resolve the effect of the played card and advance turn."""
+        """Resolve the effect of the played card (see uno_core.card_effect) and advance turn."""
         global current_card
         current_card = played_card
-        text = played_card.text
+        draws, same_player, choose_color = card_effect(played_card.text)
+        player = self.current_player
 
-        if text in number:
-            self.switch_player()
-        elif text == 'skip': self.skip()
-        elif text == 'reverse': self.reverse()
-        elif text == 'draw two': self.draw_two()
-        elif text == 'wild': self.wild()
-        elif text == 'wild draw four': self.wild_draw_four()
+        if choose_color: self.choose_wild_color()
+        drawn = self.opponent_draws(draws) if draws else []
+        self.record(lambda r: r.play(player, played_card, drawn))
+        if same_player: self.switch_player()  # skip/reverse: switch twice
+        self.switch_player()
+        if played_card.text not in number:
+            window.after(200, self.turns)
 
     def switch_player(self):
         """Switch turn to the other player."""
@@ -288,101 +400,39 @@ class GameManager:
     def is_card_valid(self, card):
         """Check if a card can be legally played on the current discard."""
         global current_card
-        if not current_card: return True
-        if card.color == current_card.color or card.text == current_card.text: return True
-        if card.text in wild: return True
-        return False
+        return uno_core.is_card_valid(card, current_card)
 
-    def reverse(self):
-        """Reverse effect (switch twice to maintain game flow)."""
-        self.switch_player()
-        self.switch_player()
-        window.after(200, self.turns)
-
-    def skip(self):
-        """Skip opponent's turn (switch twice)."""
-        self.switch_player()
-        self.switch_player()
-        window.after(200, self.turns)
-
-    def draw_two(self):
-        """Handle 'draw two' effect depending on who played it."""
-        if self.current_player == 'human':
-            # human played -> AI draws 2 silently
-            for _ in range(2):
-                self.AI.draw_card_silent(self.deck)
-            update_ai_hand_label(self)
-            self.switch_player()
-        else:
-            # AI played -> human draws 2 silently
-            self.human.draw_card_silent()
-            self.human.draw_card_silent()
-            self.switch_player()
-        window.after(200, self.turns)
-
-    def wild(self):
-        """Handle 'wild' card: player chooses a color."""
+    def choose_wild_color(self):
+        """Wild cards: the player who played it chooses the new color."""
         global current_card
         if self.current_player == 'human':
             choice = simpledialog.askstring("Choose Color", "Enter a color (red, yellow, green, blue):")
-            if choice in color:
-                current_card.color = choice
-                current_card.widget.config(bg=choice)
-            else:
-                current_card.color = 'red'
-                current_card.widget.config(bg='red')
+            current_card.color = choice if choice in color else uno_core.DEFAULT_WILD_COLOR
         else:
             current_card.color = self.AI.choose_color()
-            current_card.widget.config(bg=current_card.color)
-        self.switch_player()
-        window.after(200, self.turns)
+        current_card.widget.config(bg=current_card.color)
 
-    def wild_draw_four(self):
-        """Handle 'wild draw four' card effect for both players."""
-        global current_card
+    def opponent_draws(self, n):
+        """Draw two / wild draw four: the other player draws n cards silently; returns them."""
         if self.current_player == 'human':
-            choice = simpledialog.askstring("Choose Color", "Enter a color (red, yellow, green, blue):")
-            if choice in color:
-                current_card.color = choice
-                current_card.widget.config(bg=choice)
-            else:
-                current_card.color = 'red'
-                current_card.widget.config(bg='red')
-            # AI draws 4 silently
-            for _ in range(4):
-                self.AI.draw_card_silent(self.deck)
+            # human played -> AI draws silently
+            drawn = [self.AI.draw_card_silent(self.deck) for _ in range(n)]
             update_ai_hand_label(self)
         else:
-            current_card.color = self.AI.choose_color()
-            current_card.widget.config(bg=current_card.color)
-            # Human draws 4 silently
-            for _ in range(4):
-                self.human.draw_card_silent()
-        self.switch_player()
-        window.after(200, self.turns)
+            # AI played -> human draws silently
+            drawn = [self.human.draw_card_silent() for _ in range(n)]
+            self.AI.opponent_hand_size = len(self.human.hand)
+            self.AI.deck_size = len(self.deck)
+        return [card for card in drawn if card is not None]
 
 # ---------------- HELPERS ---------------- #
-def spawn_deck():
-    """Create a shuffled deck of Uno cards."""
-    deck = []
-    for c in color:
-        for n in number:
-            deck.append(Card(c, n))
-    for c in color:
-        for a in action:
-            deck.append(Card(c, a))
-            deck.append(Card(c, a))
-    for _ in range(4):
-        for w in wild:
-            deck.append(Card('gray40', w))
-    random.shuffle(deck)
-    return deck
-
-def spawn_hands(deck, hand_size=7):
+def spawn_deck(rng=random):
+    """Create a shuffled deck of UI cards (rng: random module or random.Random)."""
+    return uno_core.spawn_deck(rng, card_factory=Card)
+
+def spawn_hands(deck, hand_size=7, rng=random):
     """Draw a starting hand for a player from the deck."""
-    hands = random.sample(deck, hand_size)
-    for i in hands: deck.remove(i)
-    return hands
+    return uno_core.spawn_hands(deck, hand_size, rng)
 
 def layout_player_hand(player):
     """Arrange the player's hand cards visually on the UI."""
@@ -404,26 +454,42 @@ def update_ai_hand_label(manager):
     if ai_hand_label and manager and manager.AI:
         ai_hand_label.config(text=f"AI Hand: {len(manager.AI.hand)} cards")
 
+def show_ai_thinking(thinking):
+    """Show or hide the AI thinking indicator."""
+    if ai_thinking_label:
+        ai_thinking_label.config(text="AI is thinking..." if thinking else "")
+
+def close_window():
+    """Window close button: stop a running AI search before destroying the window."""
+    if game_manager:
+        game_manager.stop()
+    window.destroy()
+
 # ---------------- INITIALIZATION ---------------- #
 def initialize_game_ui(difficulty):
     """Set up the main game interface and start the GameManager."""
-    global game_manager, current_card, window, ai_hand_label
+    global game_manager, current_card, window, ai_hand_label, ai_thinking_label
     deck = spawn_deck()
     human_hand = spawn_hands(deck)
     for c in human_hand: c.create_widget()
-    current_card = deck.pop()
-    while current_card.text not in number:
-        deck.append(current_card)
-        random.shuffle(deck)
-        current_card = deck.pop()
+    current_card = uno_core.draw_start_card(deck)
     current_card.create_widget()
     current_card.place(x=350, y=200, width=100, height=120)
     ai_hand_label = tk.Label(window, text="AI Hand: 0 cards", font=("Arial",14))
     ai_hand_label.place(x=300, y=10, width=200)
+    ai_thinking_label = tk.Label(window, text="", font=("Arial", 12, "italic"))
+    ai_thinking_label.place(x=300, y=40, width=200)
     player = Player("Player 1", deck, human_hand)
     ai = AI_bot("AI", deck, spawn_hands(deck), difficulty=difficulty)
+    ai.record_discard(current_card)
     layout_player_hand(player)
-    game_manager = GameManager(player, ai, deck)
+    recorder = None
+    if GAME_LOG_PATH:
+        recorder = GameRecorder(int(time.time()) & 0xFFFFFFFF, ('AI', 'human'))
+        recorder.deal('AI', ai.hand)
+        recorder.deal('human', human_hand)
+        recorder.start(current_card)
+    game_manager = GameManager(player, ai, deck, recorder)
     update_ai_hand_label(game_manager)
     game_manager.start()
 
@@ -432,5 +498,7 @@ if __name__ == "__main__":
     root = tk.Tk()
     root.title("UNO")
     root.geometry("800x600")
+    window = root
+    root.protocol("WM_DELETE_WINDOW", close_window)
     show_title_screen(root, start_uno_game)
     root.mainloop()
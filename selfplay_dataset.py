@@ -0,0 +1,241 @@
+# selfplay_dataset.py
+# streaming self-play dataset generation: worker processes -> bounded queue -> sharded files
+import argparse
+import math
+import os
+import random
+import struct
+import time
+import traceback
+from multiprocessing import Process, Queue
+from queue import Empty
+from AI_uno import AI_bot
+from ai_performance_test import RandomPlayer
+from uno_core import NUM_KINDS, UnoGame, hand_counts, kind_id, top_id
+
+try:
+    import numpy as np  # optional: only needed for reading shards back
+except ImportError:
+    np = None
+
+NUM_GAMES = 10000
+SHARD_MB = 256          # a shard is closed once it grows past this size
+QUEUE_GAMES = 256       # finished games buffered between workers and the writer
+WORKER_POLL_S = 1.0     # how often the reader checks for workers that died without a word
+NONE = 255              # move field when the player had to draw
+
+# ---------------- RECORD FORMAT ---------------- #
+# One record per AI decision, from the deciding player's point of view:
+# game, seat, own hand counts, true opponent counts, unknown counts (what the
+# player had not seen), top id, opponent hand size, deck size, chosen kind,
+# outcome (1 win, -1 loss, 0 draw) and the root score of every kind (NaN if
+# the kind was not searched).
+MAGIC = b'UNOSELF\x00'
+VERSION = 1
+HEADER = struct.Struct('<8sII')
+RECORD = struct.Struct(f'<IB{NUM_KINDS}B{NUM_KINDS}B{NUM_KINDS}BBBBBb{NUM_KINDS}f')
+
+if np is not None:
+    RECORD_DTYPE = np.dtype([('game', '<u4'), ('seat', 'u1'),
+                             ('hand', 'u1', NUM_KINDS), ('opp_hand', 'u1', NUM_KINDS),
+                             ('unknown', 'u1', NUM_KINDS), ('top', 'u1'), ('opp_size', 'u1'),
+                             ('deck_size', 'u1'), ('move', 'u1'), ('outcome', 'i1'),
+                             ('scores', '<f4', NUM_KINDS)])
+    assert RECORD_DTYPE.itemsize == RECORD.size
+
+# ---------------- SELF-PLAY ---------------- #
+def selfplay_game(game_index, seed, difficulty='medium', opponent='self', opponent_difficulty=None):
+    """
+    Play one seeded game of an AI_bot against itself (opponent='self') or a
+    RandomPlayer and yield the packed record of every AI decision once the
+    outcome is known.
+    """
+    rng = random.Random(seed)
+    game = UnoGame.deal(('ai', 'player'), rng=rng)
+    players = {'ai': AI_bot("AI", game.deck, game.hands['ai'], difficulty=difficulty, rng=rng)}
+    if opponent == 'self':
+        players['player'] = AI_bot("AI 2", game.deck, game.hands['player'],
+                                   difficulty=opponent_difficulty or difficulty, rng=rng)
+    else:
+        players['player'] = RandomPlayer(game.hands['player'], rng)
+    bots = {name: p for name, p in players.items() if isinstance(p, AI_bot)}
+    for bot in bots.values():
+        bot.record_discard(game.current_card)
+
+    decisions = []
+    while not game.is_over():
+        mover = game.current_player
+        player = players[mover]
+        if mover in bots:
+            other = game.opponent(mover)
+            features = (hand_counts(player.hand), hand_counts(game.hands[other]), list(player.unknown_counts),
+                        top_id(game.current_card), len(game.hands[other]), len(game.deck))
+            chosen = player.choose_card(player.hand, game.current_card)
+            chosen_color = player.choose_color() if chosen else None
+            decisions.append((mover, features, kind_id(chosen) if chosen else NONE, player.last_move_scores))
+        else:
+            chosen = player.choose_card(game.current_card)
+            chosen_color = player.choose_color() if chosen else None
+
+        if chosen:
+            drawn = game.play(chosen, chosen_color)
+            drawer = game.opponent(mover)
+            for name, bot in bots.items():
+                bot.record_discard(chosen, by_ai=name == mover)
+        else:
+            drawn = game.draw(mover)
+            game.pass_turn()
+            drawer = mover
+        if drawer in bots:
+            for card in drawn:
+                bots[drawer].record_draw(card)
+        if not chosen:
+            for name, bot in bots.items():
+                if name != mover:
+                    bot.record_opponent_pass(game.current_card)
+                    bot.record_opponent_draw(len(drawn))
+        for name, bot in bots.items():
+            bot.opponent_hand_size = len(game.hands[game.opponent(name)])
+            bot.deck_size = len(game.deck)
+
+    winner = game.winner()
+    seats = list(players)
+    for mover, (hand, opp_hand, unknown, top, opp_size, deck_size), move, scores in decisions:
+        outcome = 0 if winner == 'draw' else 1 if winner == mover else -1
+        yield RECORD.pack(game_index, seats.index(mover), *hand, *opp_hand, *unknown, top,
+                          min(opp_size, 255), min(deck_size, 255), move, outcome,
+                          *(scores.get(k, math.nan) for k in range(NUM_KINDS)))
+
+def _worker(queue, worker_index, num_workers, num_games, base_seed, difficulty, opponent, opponent_difficulty):
+    """
+    Play games worker_index, worker_index + num_workers, ... and put their
+    records on queue, then None. A failure puts its traceback (a str) first.
+    """
+    try:
+        for game_index in range(worker_index, num_games, num_workers):
+            seed = f"{base_seed}:selfplay:{game_index}"
+            records = b''.join(selfplay_game(game_index, seed, difficulty, opponent, opponent_difficulty))
+            queue.put(records)  # blocks while the writer is behind (backpressure)
+    except Exception:
+        queue.put(traceback.format_exc())
+    finally:
+        queue.put(None)
+
+def generate(num_games=NUM_GAMES, workers=None, base_seed=0, difficulty='medium', opponent='self',
+             opponent_difficulty=None, queue_games=QUEUE_GAMES):
+    """
+    Run self-play on worker processes and yield each finished game's packed
+    records as they arrive. At most queue_games games are buffered, so memory
+    stays bounded however slowly the consumer writes. Raises RuntimeError if
+    a worker fails or dies.
+    """
+    workers = workers or os.cpu_count() or 1
+    queue = Queue(maxsize=queue_games)
+    procs = [Process(target=_worker, daemon=True,
+                     args=(queue, i, workers, num_games, base_seed, difficulty, opponent, opponent_difficulty))
+             for i in range(workers)]
+    for proc in procs:
+        proc.start()
+    try:
+        running = workers
+        while running:
+            try:
+                records = queue.get(timeout=WORKER_POLL_S)
+            except Empty:
+                dead = [proc for proc in procs if proc.exitcode not in (None, 0)]
+                if dead:
+                    raise RuntimeError(f"self-play worker exited with code {dead[0].exitcode}")
+                continue
+            if records is None:
+                running -= 1
+            elif isinstance(records, str):
+                raise RuntimeError(f"self-play worker failed:\n{records}")
+            else:
+                yield records
+        for proc in procs:
+            proc.join()
+    finally:
+        for proc in procs:
+            if proc.is_alive():
+                proc.terminate()
+
+# ---------------- SHARDED OUTPUT ---------------- #
+class ShardWriter:
+    """Writes records to directory/prefix-00000.bin, ... starting a new shard past max_bytes."""
+    def __init__(self, directory, prefix='selfplay', max_bytes=SHARD_MB * 1024 * 1024):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.shard = -1
+        self.file = None
+        self.size = 0
+        self.records = 0
+        self.paths = []
+        os.makedirs(directory, exist_ok=True)
+
+    def _rotate(self):
+        if self.file is not None:
+            self.file.close()
+        self.shard += 1
+        path = os.path.join(self.directory, f"{self.prefix}-{self.shard:05d}.bin")
+        self.paths.append(path)
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        self.size = HEADER.size
+
+    def write(self, records):
+        """Write packed records (whole games are never split across shards)."""
+        if self.file is None or self.size + len(records) > self.max_bytes and self.size > HEADER.size:
+            self._rotate()
+        self.file.write(records)
+        self.size += len(records)
+        self.records += len(records) // RECORD.size
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_shard(path):
+    """Memory-map a shard as a NumPy structured array of RECORD_DTYPE (needs numpy)."""
+    if np is None:
+        raise ImportError("load_shard requires numpy")
+    with open(path, 'rb') as f:
+        magic, version, record_size = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+        raise ValueError(f"{path} is not a version {VERSION} self-play shard")
+    return np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER.size)
+
+# ---------------- RUN GENERATION ---------------- #
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a self-play position dataset.")
+    parser.add_argument('--games', type=int, default=NUM_GAMES, help="games to play")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--seed', type=int, default=0, help="base seed")
+    parser.add_argument('--difficulty', choices=['easy', 'medium', 'hard'], default='medium')
+    parser.add_argument('--opponent', choices=['self', 'random'], default='self')
+    parser.add_argument('--opponent-difficulty', choices=['easy', 'medium', 'hard'],
+                        help="difficulty of the self-play opponent (default: same)")
+    parser.add_argument('--out', default='selfplay_data', help="output directory")
+    parser.add_argument('--shard-mb', type=float, default=SHARD_MB, help="shard size in MB")
+    parser.add_argument('--queue', type=int, default=QUEUE_GAMES, help="max games buffered in memory")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    games = 0
+    with ShardWriter(args.out, max_bytes=int(args.shard_mb * 1024 * 1024)) as writer:
+        for records in generate(args.games, args.workers, args.seed, args.difficulty, args.opponent,
+                                args.opponent_difficulty, args.queue):
+            writer.write(records)
+            games += 1
+            if games % 1000 == 0:
+                print(f"{games} games, {writer.records} positions, {time.perf_counter() - start:.0f}s")
+    print(f"Wrote {writer.records} positions from {games} games to {len(writer.paths)} shard(s) "
+          f"in {time.perf_counter() - start:.1f}s")
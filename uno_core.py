@@ -0,0 +1,247 @@
+# uno_core.py
+# headless Uno rules: deck, dealing, legality and action-card effects
+# (no tkinter, no AI; shared by main_game.py, AI_uno.py and the simulator)
+import random
+
+# ---------------- GAME SETTINGS ---------------- #
+color = ['red', 'yellow', 'green', 'blue']  # available colors
+number = ['0', '1', '1', '2', '2', '3', '3', '4', '4', '5', '5',
+          '6', '6', '7', '7', '8', '8', '9', '9']  # number cards
+action = ['skip', 'reverse', 'draw two']  # action cards
+wild = ['wild', 'wild draw four']        # wild cards
+WILD_COLOR = 'gray40'                     # color of a wild before one is chosen
+DEFAULT_WILD_COLOR = 'red'                # used when no valid color is chosen
+
+# ---------------- CARD ENCODING ---------------- #
+# Every distinct (color, text) card kind gets a small integer id so the search
+# can hold hands as fixed-length count vectors instead of lists of card objects.
+CARD_COLORS = color
+CARD_TEXTS = ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9'] + action
+WILD_TEXTS = wild
+
+KIND_CARDS = ([(c, t) for c in CARD_COLORS for t in CARD_TEXTS] +
+              [(WILD_COLOR, w) for w in WILD_TEXTS])
+NUM_KINDS = len(KIND_CARDS)  # 54
+KIND_ID = {card: k for k, card in enumerate(KIND_CARDS)}
+WILD_KIND_ID = {w: KIND_ID[(WILD_COLOR, w)] for w in WILD_TEXTS}
+
+# Top-of-pile ids: the 54 kinds, plus each wild once a color was chosen for it
+TOP_CARDS = KIND_CARDS + [(c, w) for w in WILD_TEXTS for c in CARD_COLORS]
+TOP_ID = {card: t for t, card in enumerate(TOP_CARDS)}
+
+
+def kind_id(card):
+    """Return the kind id of a card object (wilds are identified by text alone)."""
+    if card.text in WILD_KIND_ID:
+        return WILD_KIND_ID[card.text]
+    return KIND_ID[(card.color, card.text)]
+
+
+def top_id(card):
+    """Return the top-of-pile id of a card object, keeping a chosen wild color."""
+    return TOP_ID[(card.color, card.text)]
+
+
+def hand_counts(hand):
+    """Return the count vector of a list of card objects."""
+    counts = [0] * NUM_KINDS
+    for card in hand:
+        counts[kind_id(card)] += 1
+    return counts
+
+# ---------------- LEGAL-MOVE TABLES ---------------- #
+# PLAYABLE_MASK[top id] has bit k set when kind k may be played on that top
+# card (same color, same text, or a wild). A hand mask has bit k set when the
+# hand holds kind k, so hand_mask & PLAYABLE_MASK[top] are the legal kinds.
+PLAYABLE_MASK = [sum(1 << k for k, (c, t) in enumerate(KIND_CARDS)
+                     if c == top_color or t == top_text or t in wild)
+                 for top_color, top_text in TOP_CARDS]
+ALL_KINDS_MASK = (1 << NUM_KINDS) - 1
+
+
+def hand_mask(counts):
+    """Bitmask of the kinds present in a count vector."""
+    mask = 0
+    for k, n in enumerate(counts):
+        if n:
+            mask |= 1 << k
+    return mask
+
+
+def mask_kinds(mask):
+    """Kind ids of the set bits of a mask, lowest first."""
+    kinds = []
+    while mask:
+        low = mask & -mask
+        kinds.append(low.bit_length() - 1)
+        mask ^= low
+    return kinds
+
+# ---------------- CARD CLASS ---------------- #
+class Card:
+    """Minimal Uno card: just a color and a text."""
+    def __init__(self, color, text):
+        self.color = color
+        self.text = text
+
+# ---------------- DECK ---------------- #
+def deck_cards():
+    """Return (color, text) of every card of a standard deck, in dealing order."""
+    cards = []
+    for c in color:
+        for n in number:
+            cards.append((c, n))
+    for c in color:
+        for a in action:
+            cards.append((c, a))
+            cards.append((c, a))
+    for _ in range(4):
+        for w in wild:
+            cards.append((WILD_COLOR, w))
+    return cards
+
+# number of copies of each card kind in a full deck, indexed by kind id
+DECK_KIND_COUNTS = [0] * NUM_KINDS
+for _card in deck_cards():
+    DECK_KIND_COUNTS[KIND_ID[_card]] += 1
+
+def spawn_deck(rng=random, card_factory=Card):
+    """Create a shuffled deck (rng: random module or random.Random)."""
+    deck = [card_factory(c, t) for c, t in deck_cards()]
+    rng.shuffle(deck)
+    return deck
+
+def spawn_hands(deck, hand_size=7, rng=random):
+    """Draw a starting hand for a player from the deck."""
+    hands = rng.sample(deck, hand_size)
+    for i in hands: deck.remove(i)
+    return hands
+
+def draw_start_card(deck, rng=random):
+    """Pop the first discard, reshuffling until it is a number card."""
+    card = deck.pop()
+    while card.text not in number:
+        deck.append(card)
+        rng.shuffle(deck)
+        card = deck.pop()
+    return card
+
+# ---------------- RULES ---------------- #
+def playable_mask(current_card):
+    """Mask of the kinds that may be played on the current discard."""
+    if not current_card: return ALL_KINDS_MASK
+    return PLAYABLE_MASK[top_id(current_card)]
+
+def is_card_valid(card, current_card):
+    """Check if a card can be legally played on the current discard."""
+    return playable_mask(current_card) >> kind_id(card) & 1 == 1
+
+def valid_cards(hand, current_card):
+    """Return all cards from hand that can be legally played."""
+    mask = playable_mask(current_card)
+    return [card for card in hand if mask >> kind_id(card) & 1]
+
+def card_effect(text):
+    """
+    Effect of playing a card, as in a two-player game:
+    (cards the opponent draws, whether the same player moves again,
+    whether the player picks a new color).
+    """
+    if text in ['skip', 'reverse']:
+        return 0, True, False
+    if text == 'draw two':
+        return 2, False, False
+    if text == 'wild':
+        return 0, False, True
+    if text == 'wild draw four':
+        return 4, False, True
+    return 0, False, False
+
+# ---------------- HEADLESS GAME ---------------- #
+class UnoGame:
+    """Two-player game state with the same turn rules as main_game.GameManager."""
+    def __init__(self, hands, deck, current_card, current_player, rng=random):
+        """
+        hands: dict of player name -> list of cards (two players)
+        deck: draw pile, top of deck is the end of the list
+        current_card: card on the discard pile
+        current_player: name of the player to move
+        """
+        self.hands = hands
+        self.players = list(hands)
+        self.deck = deck
+        self.current_card = current_card
+        self.current_player = current_player
+        self.rng = rng
+        self.discard_pile = [current_card]
+        self.passes = 0  # consecutive passes with an empty deck
+
+    @classmethod
+    def deal(cls, players=('ai', 'player'), hand_size=7, rng=random, card_factory=Card):
+        """Shuffle a deck, deal every player a hand and turn up a number card."""
+        deck = spawn_deck(rng, card_factory)
+        hands = {p: spawn_hands(deck, hand_size, rng) for p in players}
+        current_card = draw_start_card(deck, rng)
+        return cls(hands, deck, current_card, players[0], rng)
+
+    def opponent(self, player):
+        """Return the other player's name."""
+        return self.players[1] if player == self.players[0] else self.players[0]
+
+    def valid_cards(self, player=None):
+        """Cards the given (default: current) player can legally play."""
+        return valid_cards(self.hands[player or self.current_player], self.current_card)
+
+    def draw(self, player, n=1):
+        """Move up to n cards from the deck to a player's hand; returns them."""
+        drawn = []
+        for _ in range(n):
+            if not self.deck:
+                break
+            drawn.append(self.deck.pop())
+        self.hands[player].extend(drawn)
+        return drawn
+
+    def switch_player(self):
+        """Switch turn to the other player."""
+        self.current_player = self.opponent(self.current_player)
+
+    def play(self, card, chosen_color=None):
+        """
+        Current player plays card: resolve its effect and advance the turn.
+        Wilds take chosen_color (DEFAULT_WILD_COLOR if not a valid color).
+        Returns the cards the opponent had to draw.
+        """
+        player = self.current_player
+        self.hands[player].remove(card)
+        self.discard_pile.append(card)
+        self.current_card = card
+        self.passes = 0
+
+        draws, same_player, choose_color = card_effect(card.text)
+        if choose_color:
+            card.color = chosen_color if chosen_color in color else DEFAULT_WILD_COLOR
+        drawn = self.draw(self.opponent(player), draws) if draws else []
+        if same_player:
+            self.switch_player()
+        self.switch_player()
+        return drawn
+
+    def pass_turn(self):
+        """End the current player's turn without playing a card."""
+        if not self.deck:
+            self.passes += 1
+        self.switch_player()
+
+    def is_over(self):
+        """True once a hand is empty or both players passed with an empty deck."""
+        return self.winner() is not None
+
+    def winner(self):
+        """Name of the player who emptied their hand, 'draw' on a stalemate, else None."""
+        for player in self.players:
+            if not self.hands[player]:
+                return player
+        if self.passes >= 2:
+            return 'draw'
+        return None